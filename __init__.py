@@ -52,7 +52,8 @@ import os
 import shutil
 import subprocess
 import threading
-from subprocess import run, Popen, PIPE
+import queue
+from subprocess import Popen, PIPE
 import concurrent.futures
 from os import path
 from typing import Dict
@@ -80,6 +81,17 @@ from _thread import start_new_thread
 import webbrowser
 import ast
 import json
+import hashlib
+import array
+import tempfile
+import bisect
+import functools
+import contextlib
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 HOME = os.path.expanduser("~").replace('\\', '/') if os.name == 'nt' else os.path.expanduser("~")
 
@@ -91,26 +103,16 @@ SCRIPT_PATH = bpy.utils.user_resource('SCRIPTS')
 ADDON_PATH = os.path.join(SCRIPT_PATH, 'addons', 'heavymeta_standard')
 #CLI = os.path.join(ADDON_PATH, 'hvym')
 CLI = os.path.join(HOME, '.local', 'share', 'heavymeta-cli', 'hvym')
-CLI_INSTALLED = False
+CLI_WORKER_CMD = 'rpc-worker'
+CLI_WORKER_TIMEOUT = 5 #seconds to wait for the worker to report ready
 #print(bpy.data.filepath.lower())
 #FILE_NAME = Path(bpy.data.filepath).stem
 FILE_NAME = 'NOT SET'
-ICP_PATH = 'NOT SET'
 DAEMON_RUNNING = False
-LOADING = False
 PROJECT_SET = False
 
 FILE_PATH = Path(__file__).parent
 
-if os.path.isfile(CLI):
-    result = subprocess.run([CLI, 'icp-project-path'], capture_output=True, text=True, check=False)
-
-    if result.returncode != 0:
-        ICP_PATH = result.stderr
-    else:
-        ICP_PATH = result.stdout
-        CLI_INSTALLED = True
-
 # -------------------------------------------------------------------
 #   Widget Elements
 # ------------------------------------------------------------------- 
@@ -639,59 +641,707 @@ class HVYM_MenuTransformGroup(GizmoGroup):
 
 
 # -------------------------------------------------------------------
-#   Heavymeta Standards Panel
+#   Progress
 # -------------------------------------------------------------------
 
-def update_progress():
-    global LOADING
-    wm = bpy.context.window_manager
-    tot = 1000  # progress from [0 - 1000]
-    wm.progress_begin(0, tot)
-    i = 0
-    while True:
-        if not LOADING:  # break the loop when loading is False
-            print("Loading cancelled.")
+class ProgressReporter:
+    """ Progress of long running tasks, posted from any thread and drawn
+    on the main thread by a timer, through the window manager progress
+    bar and the status bar text.
+    """
+
+    def __init__(self):
+        self.events = queue.Queue()
+        self.tasks = {}
+        self.shown = False
+        self.timer = self.draw
+
+    def begin(self, task, message=''):
+        self.events.put((task, 0.0, message))
+
+    def update(self, task, fraction=None, message=None):
+        self.events.put((task, fraction, message))
+
+    def end(self, task):
+        self.events.put((task, None, None, True))
+
+    def draw(self):
+        changed = False
+        while not self.events.empty():
+            event = self.events.get()
+            task, fraction, message = event[:3]
+            changed = True
+            if len(event) > 3:
+                self.tasks.pop(task, None)
+                continue
+
+            last_fraction, last_message = self.tasks.get(task, (0.0, ''))
+            self.tasks[task] = (
+                last_fraction if fraction == None else fraction,
+                last_message if message == None else message
+            )
+
+        if changed:
+            self.render(bpy.context.window_manager)
+
+        return 0.1 if len(self.tasks) > 0 else 0.5
+
+    def render(self, wm):
+        text = None
+        if len(self.tasks) > 0:
+            fraction = sum(f for f, m in self.tasks.values()) / len(self.tasks)
+            text = '  |  '.join(f'{task}: {m}' if m != '' else task for task, (f, m) in self.tasks.items())
+            if not self.shown:
+                wm.progress_begin(0, 1000)
+                self.shown = True
+            wm.progress_update(int(fraction * 1000))
+        elif self.shown:
             wm.progress_end()
-            break
-        wm.progress_update(i % tot)  # update progress bar
-        i += 1
+            self.shown = False
 
-def run_futures_cmds(cmds):
-    result = None
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        futures = {executor.submit(run, cmd, shell=True): cmd for cmd in cmds}
-        
-        for future in concurrent.futures.as_completed(futures):
-            cmd = futures[future]
-            
-            try:
-                result = future.result()  # Get the result from Future object
-                # print("Command output: ", result.stdout)
-                
-            except Exception as e:   # Checking for any exception raised by the command
-                print("Command failed with error:", str(e))
-            # else:
-            #     print(future.result().stdout)
-            #     print(f"{cmd} completed successfully")
+        for window in wm.windows:
+            window.workspace.status_text_set(text)
+
+    def clear(self):
+        while not self.events.empty():
+            self.events.get()
+        self.tasks = {}
+        if self.shown:
+            self.render(bpy.context.window_manager)
+
+
+PROGRESS = ProgressReporter()
+
+# -------------------------------------------------------------------
+#   Instrumentation
+# -------------------------------------------------------------------
+# Cli calls and the slow addon functions are timed into PROFILER. Each
+# name keeps a latency histogram over PROFILE_BUCKETS, upper bounds in
+# seconds, and the last PROFILE_MAX_EVENTS spans are kept for the
+# Chrome trace export.
+PROFILE_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0, float('inf'))
+PROFILE_MAX_EVENTS = 20000
+
+
+class ProfileStats:
+    """ Call count, time and latency histogram of one name.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = [0] * len(PROFILE_BUCKETS)
+
+    def add(self, elapsed, error):
+        self.count += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        self.histogram[bisect.bisect_left(PROFILE_BUCKETS, elapsed)] += 1
+        if error:
+            self.errors += 1
+
+    def mean(self):
+        return self.total / max(self.count, 1)
+
+    def percentile(self, fraction):
+        """ Upper bound of the bucket that holds the given fraction of
+        the calls, capped at the slowest call.
+        """
+        seen = 0
+        for bound, n in zip(PROFILE_BUCKETS, self.histogram):
+            seen += n
+            if seen >= fraction * self.count:
+                return min(bound, self.max)
+
+        return self.max
+
+
+class Profiler:
+    """ Spans recorded from any thread, as (category, name, start,
+    elapsed, thread id, args).
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.lock = threading.Lock()
+        self.events = collections.deque(maxlen=PROFILE_MAX_EVENTS)
+        self.stats = {}
+
+    def record(self, category, name, start, elapsed, args=None, error=False):
+        if not self.enabled:
+            return
+
+        with self.lock:
+            stats = self.stats.get((category, name))
+            if stats == None:
+                stats = self.stats[(category, name)] = ProfileStats()
+            stats.add(elapsed, error)
+            self.events.append((category, name, start, elapsed, threading.get_ident(), args))
+
+    @contextlib.contextmanager
+    def span(self, category, name, args=None):
+        start = time()
+        try:
+            yield
+        finally:
+            self.record(category, name, start, time() - start, args)
+
+    def summary(self):
+        """ (category, name, stats) of everything recorded, slowest total
+        first.
+        """
+        with self.lock:
+            rows = [(category, name, stats) for (category, name), stats in self.stats.items()]
+
+        return sorted(rows, key=lambda row: row[2].total, reverse=True)
+
+    def trace(self):
+        """ The recorded spans in Chrome trace_event format.
+        """
+        with self.lock:
+            events = list(self.events)
+
+        pid = os.getpid()
+        trace = []
+        for category, name, start, elapsed, tid, args in events:
+            event = {'name': name, 'cat': category, 'ph': 'X', 'ts': start * 1e6, 'dur': elapsed * 1e6, 'pid': pid, 'tid': tid}
+            if args != None:
+                event['args'] = args
+            trace.append(event)
+
+        return {'traceEvents': trace, 'displayTimeUnit': 'ms'}
+
+    def reset(self):
+        with self.lock:
+            self.events.clear()
+            self.stats = {}
+
+
+PROFILER = Profiler()
+
+def profiled(func):
+    """ Time every call of func into PROFILER.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not PROFILER.enabled:
+            return func(*args, **kwargs)
+
+        with PROFILER.span('addon', func.__name__):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+def profile_call(category, name, args, result, start, elapsed=None):
+    """ Record a finished process or cli call, with the size of its
+    arguments and output and its exit code.
+    """
+    if elapsed == None:
+        elapsed = time() - start
+    PROFILER.record(category, name, start, elapsed, {
+        'arg_bytes': sum(len(a) for a in args),
+        'output_bytes': result.size,
+        'returncode': result.returncode,
+    }, not result.ok)
+
+# -------------------------------------------------------------------
+#   CLI Results
+# -------------------------------------------------------------------
+# Cli answers come as an envelope, a json object with the version
+# marker "envelope", "status" ('ok' or 'error'), the "payload", the
+# "error" text and the "elapsed" seconds, with an optional
+# "returncode". Payloads too big for the pipe are written to
+# "payload_file" instead, which the reader deletes. Without an envelope
+# the process returncode and stdout are used as they are. Older cli
+# versions print python literals, decode_cli_output still reads those
+# but logs that it did.
+CLI_ENVELOPE_VERSION = 1
+CLI_ENVELOPE_ENV = 'HVYM_CLI_ENVELOPE'
+CLI_LEGACY_OUTPUT = False
+
+def decode_cli_output(text):
+    """ The one decoder for cli output: json, then a python literal,
+    then the text itself.
+    """
+    global CLI_LEGACY_OUTPUT
+    text = text.strip()
+    if text == '':
+        return None
+
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+
+    try:
+        value = ast.literal_eval(text)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return text
+
+    if not CLI_LEGACY_OUTPUT:
+        CLI_LEGACY_OUTPUT = True
+        print("hvym cli output is not json, reading it as a legacy python literal. Update the cli.")
+
+    return value
+
+
+class CLIResult:
+    """ Answer of one cli call. payload is decoded from stdout on first
+    use, unless the cli sent it already decoded in an envelope.
+    """
+
+    def __init__(self, args, returncode, stdout='', stderr='', elapsed=0.0):
+        self.args = args
+        self.returncode = returncode
+        self.stderr = stderr
+        self.elapsed = elapsed
+        self.size = len(stdout) if stdout != None else 0
+        self._stdout = stdout
+        self._payload = None
+        self._decoded = False
+
+    @classmethod
+    def from_envelope(cls, args, envelope, elapsed, returncode=None):
+        """ Result of an envelope, returncode is the exit code of the
+        process that printed it. An envelope returncode wins over it,
+        the status only fills in for a missing or zero returncode.
+        """
+        ok = envelope.get('status') == 'ok'
+        returncode = envelope.get('returncode', returncode)
+        if returncode == None or (returncode == 0 and not ok):
+            returncode = 0 if ok else 1
+
+        result = cls(args, returncode, None, envelope.get('error') or '', envelope.get('elapsed', elapsed))
+        payload = envelope.get('payload')
+        payload_file = envelope.get('payload_file')
+        if payload_file != None:
+            result.size = os.path.getsize(payload_file)
+            with open(payload_file, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+            os.unlink(payload_file)
+
+        result._payload = payload
+        result._decoded = True
+        return result
+
+    @classmethod
+    def from_output(cls, args, returncode, stdout, stderr, elapsed):
+        """ Result of a raw process output, which may hold an envelope.
+        """
+        result = cls(args, returncode, stdout, stderr, elapsed)
+        envelope = result.payload
+        if isinstance(envelope, dict) and envelope.get('envelope') == CLI_ENVELOPE_VERSION:
+            result = cls.from_envelope(args, envelope, elapsed, returncode)
+            result.size += len(stdout)
 
         return result
 
+    @property
+    def ok(self):
+        return self.returncode == 0
+
+    @property
+    def stdout(self):
+        if self._stdout == None:
+            self._stdout = self._payload if isinstance(self._payload, str) else json.dumps(self._payload)
+        return self._stdout
+
+    @property
+    def payload(self):
+        if not self._decoded:
+            self._payload = decode_cli_output(self._stdout)
+            self._decoded = True
+        return self._payload
+
+    @property
+    def error(self):
+        return self.stderr or f"{' '.join(self.args[:1])} exited with {self.returncode}"
+
+
+def cli_payload(result):
+    """ The payload of result, raises when the call failed.
+    """
+    if not result.ok:
+        raise RuntimeError(result.error)
+
+    return result.payload
+
+def run_output_to_file(args, env=None, stdin=None, timeout=None, token=None):
+    """ Run a process with its stdout going to a temp file, so large
+    outputs don't fill the pipe buffer. The process is killed after
+    timeout seconds, or when token is cancelled. Returns a CLIResult.
+    """
+    start = time()
+    name = ' '.join([os.path.basename(args[0])] + args[1:2])
+    with tempfile.TemporaryFile('w+', encoding='utf-8') as out:
+        process = Popen(args, stdin=PIPE if stdin != None else None, stdout=out, stderr=PIPE, text=True, encoding='utf-8', env=env)
+        if token != None:
+            token.attach(process)
+        try:
+            _, error = process.communicate(stdin, timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            return CLIResult(args, -1, '', f'{name} timed out after {timeout}s', time() - start)
+        finally:
+            if token != None:
+                token.detach(process)
+        out.seek(0)
+        stdout = out.read()
+
+    if token != None and token.cancelled():
+        return CLIResult(args, -1, '', f'{name} was cancelled', time() - start)
+
+    return CLIResult.from_output(args, process.returncode, stdout, error, time() - start)
+
+# Arguments longer than CLI_ARG_INLINE_MAX are kept out of argv when
+# the cli runs as its own process. The first is streamed over stdin and
+# passed as "@payload:-", the others are written to temp files passed
+# as "@payload:<path>". Only cli versions listing CLI_PAYLOAD_CAPABILITY
+# in their capabilities read these, older ones get every argument in
+# argv. The capabilities come from the worker ready message, for clis
+# without worker mode they are asked for once with CLI_CAPABILITIES_CMD.
+# The worker gets its arguments over its stdin already, without argv
+# limits.
+CLI_ARG_INLINE_MAX = 32 * 1024
+CLI_PAYLOAD_PREFIX = '@payload:'
+CLI_PAYLOAD_CAPABILITY = 'payload-args'
+CLI_CAPABILITIES_CMD = 'capabilities'
+CLI_CAPABILITIES_TIMEOUT = 5 #seconds
+CLI_CAPABILITIES = {}
+CLI_CAPABILITIES_LOCK = threading.Lock()
+
+def cli_capabilities(cli):
+    """ Capabilities of cli, from its worker when it has reported them,
+    otherwise from a one-shot probe whose answer is kept for the session.
+    Clis that don't know the probe command have none.
+    """
+    if CLI_WORKER.cli == cli and len(CLI_WORKER.capabilities) > 0:
+        return CLI_WORKER.capabilities
+
+    with CLI_CAPABILITIES_LOCK:
+        if cli not in CLI_CAPABILITIES:
+            capabilities = frozenset()
+            result = run_output_to_file([cli, CLI_CAPABILITIES_CMD], envelope_env(), None, CLI_CAPABILITIES_TIMEOUT)
+            if result.ok:
+                payload = result.payload
+                if isinstance(payload, dict):
+                    payload = payload.get('capabilities', ())
+                if isinstance(payload, (list, tuple)):
+                    capabilities = frozenset(str(c) for c in payload)
+            CLI_CAPABILITIES[cli] = capabilities
+
+        return CLI_CAPABILITIES[cli]
+
+def cli_payload_args(cli, args):
+    """ Returns the argv for args, the text to stream over stdin and the
+    temp files to delete after the call.
+    """
+    if all(len(arg) <= CLI_ARG_INLINE_MAX for arg in args):
+        return list(args), None, []
+
+    if CLI_PAYLOAD_CAPABILITY not in cli_capabilities(cli):
+        return list(args), None, []
+
+    argv = []
+    stdin = None
+    files = []
+    for arg in args:
+        if len(arg) <= CLI_ARG_INLINE_MAX:
+            argv.append(arg)
+        elif stdin == None:
+            stdin = arg
+            argv.append(CLI_PAYLOAD_PREFIX+'-')
+        else:
+            fd, file_path = tempfile.mkstemp(prefix='hvym_payload_', suffix='.json')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(arg)
+            files.append(file_path)
+            argv.append(CLI_PAYLOAD_PREFIX+file_path)
+
+    return argv, stdin, files
+
+def envelope_env():
+    env = dict(os.environ)
+    env[CLI_ENVELOPE_ENV] = str(CLI_ENVELOPE_VERSION)
+    return env
+
+def run_cli_once(cli, args, timeout=None, token=None):
+    """ Run one cli command as its own process, returns a CLIResult.
+    """
+    argv, stdin, files = cli_payload_args(cli, args)
+    start = time()
+    try:
+        result = run_output_to_file([cli]+argv, envelope_env(), stdin, timeout, token)
+        profile_call('cli', args[0], args, result, start)
+        return result
+    finally:
+        for file_path in files:
+            os.unlink(file_path)
+
+
+class CLIWorker:
+    """ Long-lived hvym process, started lazily on the first call and
+    restarted when it dies. Requests are newline framed JSON-RPC messages
+    on the worker's stdin, answers come back the same way on its stdout.
+    If the installed cli has no worker mode, calls fall back to one
+    process per command.
+    """
+
+    def __init__(self, cli):
+        self.cli = cli
+        self.process = None
+        self.lines = None
+        self.supported = True
+        self.capabilities = frozenset()
+        self.lock = threading.Lock()
+        self.request_id = 0
+        self.response_size = 0
+
+    def _read_lines(self, process, lines):
+        for line in process.stdout:
+            lines.put(line)
+        lines.put(None)
+
+    def _start(self):
+        self.process = Popen([self.cli, CLI_WORKER_CMD], stdin=PIPE, stdout=PIPE, stderr=subprocess.DEVNULL, text=True, encoding='utf-8', bufsize=1)
+        self.lines = queue.Queue()
+        reader = threading.Thread(target=self._read_lines, args=(self.process, self.lines), daemon=True)
+        reader.start()
+
+        try:
+            hello = self.lines.get(timeout=CLI_WORKER_TIMEOUT)
+            hello = json.loads(hello) if hello is not None else {}
+            ready = hello.get('method') == 'ready'
+        except (queue.Empty, ValueError):
+            ready = False
+
+        if ready:
+            self.capabilities = frozenset((hello.get('params') or {}).get('capabilities', ()))
+
+        if not ready:
+            print("hvym cli has no worker mode, using one process per call.")
+            self.supported = False
+            self.stop()
+
+        return ready
+
+    def _alive(self):
+        if self.process is not None and self.process.poll() is None:
+            return True
+        if not self.supported:
+            return False
+        return self._start()
+
+    def _send(self, message):
+        self.process.stdin.write(json.dumps(message)+'\n')
+        self.process.stdin.flush()
+
+    def _run_once(self, args):
+        return run_cli_once(self.cli, args, cli_timeout(args))
+
+    def _result(self, args, result, elapsed):
+        if not isinstance(result, dict):
+            return CLIResult(args, -1, '', result, elapsed)
+        if result.get('envelope') == CLI_ENVELOPE_VERSION:
+            return CLIResult.from_envelope(args, result, elapsed, result.get('returncode'))
+
+        return CLIResult(args, result['returncode'], result['stdout'], result['stderr'], elapsed)
+
+    def _request(self, method, params, timeout=None):
+        """ Send a request and wait up to timeout seconds for its answer.
+        Returns the result, or an error message string if the worker
+        failed. A worker that times out is killed, the next call starts
+        a fresh one.
+        """
+        self.request_id += 1
+        deadline = None if timeout == None else time() + timeout
+        try:
+            self._send({'jsonrpc': '2.0', 'id': self.request_id, 'method': method, 'params': params})
+            while True:
+                line = self.lines.get(timeout=None if deadline == None else max(deadline - time(), 0))
+                if line is None:
+                    break
+                response = json.loads(line)
+                if response.get('id') == self.request_id:
+                    break
+                #answer to a request that was given up on, or a notification
+                print(f"Dropped hvym cli worker message {response.get('id')}, waiting for {self.request_id}.")
+        except queue.Empty:
+            self.stop()
+            return f'hvym cli worker timed out after {timeout}s.'
+        except (OSError, ValueError):
+            line = None
+
+        if line is None:
+            self.stop()
+            return 'hvym cli worker died during call.'
+
+        self.response_size = len(line)
+        if 'error' in response:
+            return response['error'].get('message', '')
+
+        return response['result']
+
+    def call(self, args):
+        """ Run a single cli command and return a CLIResult.
+        """
+        args = [str(a) for a in args]
+        with self.lock:
+            if not self._alive():
+                return self._run_once(args)
+
+            start = time()
+            result = self._request('call', {'args': args, 'envelope': CLI_ENVELOPE_VERSION}, cli_timeout(args))
+            size = self.response_size
+
+        elapsed = time() - start
+        result = self._result(args, result, elapsed)
+        result.size = result.size or size
+        profile_call('cli', args[0], args, result, start, elapsed)
+
+        return result
+
+    def batch(self, calls):
+        """ Run several cli commands in order in one request, returns a
+        list of CLIResult.
+        """
+        calls = [[str(a) for a in args] for args in calls]
+        with self.lock:
+            if not self._alive():
+                return [self._run_once(args) for args in calls]
+
+            start = time()
+            timeouts = [cli_timeout(args) for args in calls]
+            timeout = None if None in timeouts else sum(timeouts)
+            results = self._request('batch', {'calls': calls, 'envelope': CLI_ENVELOPE_VERSION}, timeout)
+            size = self.response_size // max(len(calls), 1)
+
+        elapsed = (time() - start) / max(len(calls), 1)
+        if isinstance(results, str):
+            results = [CLIResult(args, -1, '', results, elapsed) for args in calls]
+        else:
+            results = [self._result(args, r, elapsed) for args, r in zip(calls, results)]
+
+        #the worker runs the batch in order, each call gets its share of the time
+        for i, (args, result) in enumerate(zip(calls, results)):
+            result.size = result.size or size
+            profile_call('cli', args[0], args, result, start + i * elapsed, elapsed)
+
+        return results
+
+    def stop(self):
+        if self.process is not None:
+            if self.process.poll() is None:
+                self.process.kill()
+            self.process = None
+
+
+CLI_WORKER = CLIWorker(CLI)
+
+
+class CLIDiscovery:
+    """ Finds out on CLI_EXECUTOR whether the cli is installed and which
+    icp project path it has set. Nothing runs until the first use, the
+    result is then kept for the session. Waiting for it gives up after
+    CLI_DISCOVERY_TIMEOUT seconds.
+    """
+
+    def __init__(self, cli):
+        self.cli = cli
+        self.lock = threading.Lock()
+        self.future = None
+        self.ready = threading.Event()
+        self.installed = False
+        self.icp_path = 'NOT SET'
+        self.path_set = False
+
+    def start(self):
+        with self.lock:
+            if self.future != None or self.ready.is_set():
+                return
+            if not os.path.isfile(self.cli):
+                self.ready.set()
+                return
+            try:
+                self.future = CLI_EXECUTOR.submit(['icp-project-path'], timeout=CLI_DISCOVERY_TIMEOUT)
+            except RuntimeError as e:
+                #tried again on the next use
+                print(e)
+                return
+
+        self.future.add_done_callback(self._discovered)
+
+    def _discovered(self, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"Could not run the Heavymeta cli: {e}")
+            return
+        finally:
+            self.ready.set()
+
+        with self.lock:
+            if result.returncode == 0:
+                self.installed = True
+            #a path set since the lookup started is newer
+            if not self.path_set:
+                self.icp_path = result.stdout if result.returncode == 0 else result.error
+
+    def wait(self, timeout=None):
+        if timeout == None:
+            timeout = CLI_DISCOVERY_TIMEOUT
+        self.start()
+        return self.ready.wait(timeout)
+
+    def set_icp_path(self, icp_path):
+        """ Record a project path found by other calls, doesn't wait for
+        the discovery.
+        """
+        with self.lock:
+            self.icp_path = icp_path
+            self.path_set = True
+
+
+CLI_DISCOVERY_TIMEOUT = 10
+CLI_DISCOVERY = CLIDiscovery(CLI)
+
+def cliInstalled():
+    CLI_DISCOVERY.wait()
+    return CLI_DISCOVERY.installed
+
+def icpPath():
+    CLI_DISCOVERY.wait()
+    return CLI_DISCOVERY.icp_path
+
 def run_command(cmd):
-    process = Popen(cmd, stdout=PIPE, stderr=PIPE)
-    output, error = process.communicate()
+    if cmd[0] == CLI:
+        process = CLI_WORKER.call(cmd[1:])
+    else:
+        start = time()
+        process = run_output_to_file(cmd)
+        profile_call('process', os.path.basename(cmd[0]), cmd, process, start)
 
     if process.returncode != 0:   # Checking the return code
-        print("Command failed with error:", error.decode('utf-8'))
+        print("Command failed with error:", process.stderr)
     else:
-        print(output.decode('utf-8'))
-        return output.decode('utf-8')
+        output = process.stdout
+        print(output)
+        return output
 
 def call_cli_threaded(commands):
+    """ Fire and forget a cli command, such as a splash or loading
+    window. It runs as its own process on CLI_WINDOW_EXECUTOR, so
+    neither the worker nor CLI_EXECUTOR is kept waiting while the
+    window is open.
+    """
     if os.path.isfile(CLI):
-        command = [CLI]+commands
-
-        thread = threading.Thread(target=run_command, args=(command,))
-        thread.start()
+        try:
+            CLI_WINDOW_EXECUTOR.submit(commands)
+        except RuntimeError as e:
+            print(e)
 
 def call_cli(call_arr):
     result = None
@@ -700,20 +1350,304 @@ def call_cli(call_arr):
         arr.append(str(p))
 
     if os.path.isfile(CLI):
-        cli_call = [CLI]
-        cli_call = cli_call+arr
+        result = cli_output(CLI_WORKER.call(arr))
+
+    return result
+
+def call_cli_payload(call_arr):
+    """ The decoded payload of a cli call, raises when it failed.
+    """
+    if not os.path.isfile(CLI):
+        return None
+
+    return cli_payload(CLI_WORKER.call(call_arr))
+
+def call_cli_batch(call_arrs):
+    """ Run several cli commands in order in a single round-trip,
+    returns their outputs in the same order as call_cli would.
+    """
+    results = [None] * len(call_arrs)
+
+    if os.path.isfile(CLI):
+        calls = CLI_WORKER.batch(call_arrs)
+        results = [cli_output(call) for call in calls]
 
-        call = subprocess.run(cli_call, capture_output=True, text=True, check=False)
+    return results
 
-        if call.returncode != 0:
-            print("Command failed with error:")
-            print(call.stderr)
-            result = call.stderr
-        else:
-            result = call.stdout
-            # print(result)
+def cli_output(call):
+    if call.returncode != 0:
+        print("Command failed with error:")
+        print(call.stderr)
+        return call.stderr
 
-    return result
+    return call.stdout
+
+# -------------------------------------------------------------------
+#   CLI Cache
+# -------------------------------------------------------------------
+# Seconds the answer of a cli lookup is reused for, commands not
+# listed here are never cached. Setting the same project again is a
+# no-op, so icp-project is cached too. The active account can be
+# changed with the cli outside of Blender, so icp-account-info is only
+# kept for the scene's hvym_account_cache_ttl seconds.
+CLI_ACCOUNT_CACHE_TTL = 30
+CLI_CACHE_TTL = {
+    'icp-account-info': CLI_ACCOUNT_CACHE_TTL,
+    'icp-project': 300,
+    'icp-project-path': 300,
+    'icp-model-path': 300,
+    'icp-minter-path': 300,
+    'icp-custom-client-path': 300,
+    'icp-minter-model-path': 300,
+}
+PROJECT_PATH_COMMANDS = ('icp-project', 'icp-project-path', 'icp-model-path', 'icp-minter-path', 'icp-custom-client-path', 'icp-minter-model-path')
+# cached answers that are outdated once a cached command has run,
+# the operators changing the account, network or project drop the
+# whole cache
+CLI_CACHE_INVALIDATES = {
+    'icp-project': PROJECT_PATH_COMMANDS,
+}
+
+
+class CLICache:
+    """ CLIResults of successful cli lookups, by their arguments, reused
+    until their CLI_CACHE_TTL runs out or they are invalidated.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def get(self, args):
+        ttl = CLI_CACHE_TTL.get(args[0])
+        if ttl == None:
+            return None
+
+        with self.lock:
+            entry = self.entries.get(tuple(args))
+
+        if entry == None or time() - entry[0] > ttl:
+            return None
+
+        return entry[1]
+
+    def put(self, args, result):
+        if args[0] in CLI_CACHE_INVALIDATES:
+            self.invalidate(*CLI_CACHE_INVALIDATES[args[0]])
+        if args[0] in CLI_CACHE_TTL:
+            with self.lock:
+                self.entries[tuple(args)] = (time(), result)
+
+    def invalidate(self, *commands):
+        """ Drop the answers of commands, or everything without any.
+        """
+        with self.lock:
+            if len(commands) == 0:
+                self.entries.clear()
+                return
+            for key in [key for key in self.entries if key[0] in commands]:
+                del self.entries[key]
+
+
+CLI_CACHE = CLICache()
+
+def call_cli_cached(call_arr):
+    """ call_cli, answered from CLI_CACHE when the command is cached.
+    """
+    return call_cli_batch_cached([call_arr])[0]
+
+def call_cli_batch_cached(call_arrs):
+    """ call_cli_batch, only sending the commands CLI_CACHE can't answer.
+    """
+    return [cli_output(result) if result != None else None for result in call_cli_results(call_arrs)]
+
+def call_cli_json(call_arr):
+    """ The decoded payload of a cli call, cached like call_cli_cached.
+    Raises when the call failed.
+    """
+    result = call_cli_results([call_arr])[0]
+    if result == None:
+        return None
+
+    return cli_payload(result)
+
+def call_cli_results(call_arrs):
+    """ CLIResults of the calls, the ones CLI_CACHE can't answer are sent
+    in one batch.
+    """
+    call_arrs = [[str(a) for a in args] for args in call_arrs]
+    results = []
+    outdated = set()
+    for args in call_arrs:
+        result = None if args[0] in outdated else CLI_CACHE.get(args)
+        if result == None:
+            #later lookups this command changes are sent as well
+            outdated.update(CLI_CACHE_INVALIDATES.get(args[0], ()))
+        results.append(result)
+
+    missing = [i for i, result in enumerate(results) if result == None]
+    if len(missing) == 0 or not os.path.isfile(CLI):
+        return results
+
+    calls = CLI_WORKER.batch([call_arrs[i] for i in missing])
+    for i, call in zip(missing, calls):
+        results[i] = call
+        if call.ok:
+            CLI_CACHE.put(call_arrs[i], call)
+
+    return results
+
+# -------------------------------------------------------------------
+#   CLI Executor
+# -------------------------------------------------------------------
+# Cli work off the main thread shares one bounded pool. Each call runs
+# as its own process, killed after its CLI_TIMEOUTS seconds or when its
+# CancelToken is cancelled. At most CLI_EXECUTOR_QUEUE calls wait or
+# run at once, beyond that worker threads wait for a slot and the main
+# thread gets an error instead of freezing the ui. Splash and loading
+# windows and the test daemon start stay open for minutes, they get
+# their own pool, CLI_WINDOW_EXECUTOR, so they can't hold up the calls
+# that something waits on. Dialogs don't go through either pool.
+CLI_EXECUTOR_WORKERS = 4
+CLI_EXECUTOR_QUEUE = 16
+CLI_WINDOW_WORKERS = 4
+CLI_WINDOW_QUEUE = 8
+CLI_DEFAULT_TIMEOUT = 120
+# None waits for as long as the user keeps the dialog open, for
+# dialogs and commands that ask the user something
+CLI_TIMEOUTS = {
+    'icp-start-assets': 300,
+    'icp-stop-assets': 60,
+    'icp-init': 600,
+    'icp-deploy-assets': 1800,
+    'icp-update-model': 600,
+    'icp-update-model-minter': 600,
+    'icp-update-custom-client': 600,
+    'custom-prompt': None,
+    'custom-choice-prompt': None,
+    'icp-new-account': None,
+    'icp-set-account': None,
+    'img-to-url': None,
+    'custom-loading-msg': 600,
+    'splash': 600,
+}
+
+def cli_timeout(args):
+    if len(args) == 0:
+        return CLI_DEFAULT_TIMEOUT
+
+    return CLI_TIMEOUTS.get(str(args[0]), CLI_DEFAULT_TIMEOUT)
+
+
+class CancelToken:
+    """ Shared by the calls of one piece of work. cancel() drops its
+    queued calls and kills the processes still running.
+    """
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.lock = threading.Lock()
+        self.processes = set()
+
+    def cancelled(self):
+        return self.event.is_set()
+
+    def attach(self, process):
+        with self.lock:
+            self.processes.add(process)
+        if self.event.is_set():
+            process.terminate()
+
+    def detach(self, process):
+        with self.lock:
+            self.processes.discard(process)
+
+    def cancel(self):
+        self.event.set()
+        with self.lock:
+            processes = list(self.processes)
+        for process in processes:
+            process.terminate()
+
+
+class CLIExecutor:
+    """ The shared pool for cli calls, started on first use. submit()
+    returns a concurrent.futures.Future of the call's CLIResult.
+    """
+
+    def __init__(self, cli, workers, capacity):
+        self.cli = cli
+        self.workers = workers
+        self.slots = threading.BoundedSemaphore(capacity)
+        self.lock = threading.Lock()
+        self.pool = None
+        self.running = {}
+
+    def _pool(self):
+        with self.lock:
+            if self.pool == None:
+                self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='hvym_cli')
+            return self.pool
+
+    def _call(self, args, timeout, token):
+        if token.cancelled():
+            return CLIResult(args, -1, '', f'{args[0]} was cancelled')
+
+        return run_cli_once(self.cli, args, timeout, token)
+
+    def _done(self, future):
+        with self.lock:
+            self.running.pop(future, None)
+        self.slots.release()
+
+    def submit(self, args, timeout=None, token=None):
+        """ Queue a cli call, timeout defaults to cli_timeout(args).
+        Raises RuntimeError when called on the main thread while the
+        queue is full.
+        """
+        args = [str(a) for a in args]
+        if timeout == None:
+            timeout = cli_timeout(args)
+        if token == None:
+            token = CancelToken()
+
+        if not self.slots.acquire(threading.current_thread() is not threading.main_thread()):
+            raise RuntimeError(f'Too many cli calls running, {args[0]} was not started.')
+
+        try:
+            future = self._pool().submit(self._call, args, timeout, token)
+        except RuntimeError:
+            self.slots.release()
+            raise
+
+        with self.lock:
+            self.running[future] = token
+        future.add_done_callback(self._done)
+
+        return future
+
+    def shutdown(self):
+        """ Cancel everything queued or running, the pool is started
+        again by the next submit.
+        """
+        with self.lock:
+            pool = self.pool
+            self.pool = None
+            tokens = list(self.running.values())
+
+        for token in tokens:
+            token.cancel()
+        if pool != None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+CLI_EXECUTOR = CLIExecutor(CLI, CLI_EXECUTOR_WORKERS, CLI_EXECUTOR_QUEUE)
+CLI_WINDOW_EXECUTOR = CLIExecutor(CLI, CLI_WINDOW_WORKERS, CLI_WINDOW_QUEUE)
+
+def on_future_done(future, func):
+    """ Call func(future) on the main thread once future is done.
+    """
+    future.add_done_callback(lambda done: call_on_main_thread(lambda: func(done)))
 
 def random_id(length = 8):
     """ Generates a random alphanumeric id string.
@@ -776,51 +1710,102 @@ def UpdateAnimData(context):
                 hvym_meta_data[i].anim_blending = model.animation_data.action_blend_type
 
 
-def RebuildMaterialSets(context):
-    hvym_meta_data = context.collection.hvym_meta_data
+def mat_set_data_collection():
+    col_name = 'HVYM_OBJ_DATA'
+    data_col = bpy.data.collections.get(col_name)
+    if data_col is None:
+        data_col = bpy.data.collections.new(col_name)
+        data_col.hide_select = True 
+        data_col.color_tag = 'COLOR_01'      
+        bpy.context.scene.collection.children.link(data_col)
+
+    return data_col
+
+def mat_set_mesh_arrays(count):
+    """ Flat vertex coordinates, loop vertex indices, polygon loop starts
+    and polygon material indices of the material set helper mesh.
+    """
+    size = 0.01
+
+    if np != None:
+        co = np.empty((count, 3, 3), dtype=np.float32)
+        co[:, :, 0] = (size, size, -size)
+        co[:, :, 1] = (size, -size, -size)
+        co[:, :, 2] = (np.arange(count, dtype=np.float32) * size)[:, None]
+        vertex_index = (np.arange(count, dtype=np.int32)[:, None] + np.arange(3, dtype=np.int32)).ravel()
+        loop_start = np.arange(0, count*3, 3, dtype=np.int32)
+        material_index = np.arange(count, dtype=np.int32)
+
+        return co.ravel(), vertex_index, loop_start, material_index
+
+    co = []
+    vertex_index = []
+    for j in range(count):
+        co.extend(( size,  size,  size*j))
+        co.extend(( size,  -size,  size*j))
+        co.extend(( -size,  -size,  size*j))
+        vertex_index.extend((j, j+1, j+2))
+
+    return co, vertex_index, list(range(0, count*3, 3)), list(range(count))
+
+def build_mat_set_mesh(mesh, count):
+    """ One small triangle per material in the set,
+    each using the material slot with the same index.
+    """
+    co, vertex_index, loop_start, material_index = mat_set_mesh_arrays(count)
+
+    mesh.vertices.add(count*3)
+    mesh.loops.add(count*3)
+    mesh.polygons.add(count)
+    mesh.vertices.foreach_set('co', co)
+    mesh.loops.foreach_set('vertex_index', vertex_index)
+    mesh.polygons.foreach_set('loop_start', loop_start)
+    #loop_total is derived from loop_start on newer blender versions
+    if not bpy.types.MeshPolygon.bl_rna.properties['loop_total'].is_readonly:
+        mesh.polygons.foreach_set('loop_total', [3]*count)
+    mesh.polygons.foreach_set('material_index', material_index)
+    mesh.update(calc_edges=True)
+
+@profiled
+def RebuildMaterialSets(context, collection=None):
+    if collection == None:
+        collection = context.collection
+    hvym_meta_data = collection.hvym_meta_data
 
     for i in range(len(hvym_meta_data)):
-        verts = []    
-        edges = []
-        faces = []
-        if hvym_meta_data[i].trait_type == 'mat_set':
-            name = 'mat_set'+context.collection.hvym_id+'_'+hvym_meta_data[i].type
-            col_name = 'HVYM_OBJ_DATA'
-            obj = bpy.context.scene.objects.get(name)
+        item = hvym_meta_data[i]
+        if item.trait_type != 'mat_set':
+            continue
+
+        name = 'mat_set'+collection.hvym_id+'_'+item.type
+        mats = [m.mat_ref for m in item.mat_set]
+        obj = item.mat_lib_ref
+
+        if obj == None or obj.data == None or bpy.data.objects.get(obj.name) != obj:
             mesh = bpy.data.meshes.new('MESH_'+name)  # add the new mesh
-                
-            obj = hvym_meta_data[i].mat_lib_ref
-            if obj:
-                bpy.data.meshes.remove(obj.data)
-                    
-            data_col = bpy.data.collections.get(col_name)
-            if data_col is None:
-                data_col = bpy.data.collections.new(col_name)
-                data_col.hide_select = True 
-                data_col.color_tag = 'COLOR_01'      
-                bpy.context.scene.collection.children.link(data_col)
-                    
             obj = bpy.data.objects.new(name, mesh)
             lockObj(obj)
-            data_col.objects.link(obj)
-            hvym_meta_data[i].mat_lib_ref = obj
-            j=0       
-            for m in hvym_meta_data[i].mat_set:
-                size = 0.01
-                bpy.data.materials.new(name=m.name)
-                obj.data.materials.append(m.mat_ref)
-                verts.append(( size,  size,  size*j))
-                verts.append(( size,  -size,  size*j))
-                verts.append(( -size,  -size,  size*j))
-                faces.append([j,j+1,j+2])
-                j+=1
-                    
-            mesh.from_pydata(verts, edges, faces)
+            mat_set_data_collection().objects.link(obj)
+            item.mat_lib_ref = obj
+
+        mesh = obj.data
+        if not obj.name.startswith(name):
+            obj.name = name
+            mesh.name = 'MESH_'+name
+
+        if len(mesh.materials) == len(mats) and len(mesh.polygons) == len(mats):
+            #same size, only swap the slots that changed
+            for j in range(len(mats)):
+                if mesh.materials[j] != mats[j]:
+                    mesh.materials[j] = mats[j]
+            continue
 
-            j=0
-            for mat in obj.data.materials:
-                obj.data.polygons[j].material_index = j
-                j+=1
+        mesh.clear_geometry()
+        mesh.materials.clear()
+        for mat in mats:
+            mesh.materials.append(mat)
+
+        build_mat_set_mesh(mesh, len(mats))
 
 def get_material_properties(mat):
     data = {}
@@ -850,7 +1835,76 @@ def handle_mat_props(item, mat_props):
             item.mat_sheen = True
 
 
+# extracted material data by material pointer,
+# stored as (fingerprint, node tree pointer, mat_props)
+MAT_REF_CACHE = {}
+
+# the node inputs extract_mat_ref reads, by node type, other edits
+# reach the cache through the depsgraph handler
+MAT_REF_SOCKETS = {
+    'EEVEE_SPECULAR': ('Specular Tint', 'Specular', 'Roughness', 'Emissive Color', 'Transparency', 'Clear Coat', 'Clear Coat Roughness'),
+    'BSDF_DIFFUSE': ('Color', 'Roughness', 'Metallic'),
+    'BSDF_SHEEN': ('Color', 'Roughness', 'Metallic'),
+    'BSDF_TOON': ('Color', 'Size', 'Smooth'),
+    'BSDF_PRINCIPLED': ('Roughness', 'Metallic', 'Specular Tint', 'Specular IOR Level', 'Anisotropic', 'Anisotropic Rotation',
+                        'Coat Weight', 'Emission Color', 'Emission Strength', 'Sheen Tint', 'Sheen Weight'),
+}
+
+def mat_fingerprint(mat):
+    tree = mat.node_tree
+    values = []
+    for node in tree.nodes:
+        sockets = MAT_REF_SOCKETS.get(node.type)
+        if sockets == None:
+            continue
+        for name in sockets:
+            socket = node.inputs.get(name)
+            if socket != None:
+                value = socket.default_value
+                values.append(tuple(value) if hasattr(value, '__len__') else value)
+
+    return (mat.name, len(tree.nodes), len(tree.links), tuple(mat.diffuse_color), tuple(values))
+
+@profiled
 def create_mat_ref(value):
+    key = value.as_pointer()
+    fingerprint = mat_fingerprint(value)
+    cached = MAT_REF_CACHE.get(key)
+
+    if cached == None or cached[0] != fingerprint:
+        cached = (fingerprint, value.node_tree.as_pointer(), extract_mat_ref(value))
+        MAT_REF_CACHE[key] = cached
+
+    return dict(cached[2])
+
+def invalidate_mat_ref(id_data):
+    """ Drop the cached data of a changed material or node tree, and
+    flag the items that reference the material.
+    """
+    key = id_data.as_pointer()
+    mat_keys = set()
+    for mat_key in list(MAT_REF_CACHE.keys()):
+        if mat_key == key or MAT_REF_CACHE[mat_key][1] == key:
+            del MAT_REF_CACHE[mat_key]
+            mat_keys.add(mat_key)
+
+    #items loaded from a file are clean before their materials are cached
+    if isinstance(id_data, bpy.types.Material):
+        mat_keys.add(key)
+    else:
+        mat_keys.update(mat.as_pointer() for mat in bpy.data.materials if mat.node_tree != None and mat.node_tree.as_pointer() == key)
+
+    markMaterialDirty(mat_keys)
+
+def markMaterialDirty(mat_keys):
+    for col in bpy.data.collections:
+        for i in range(len(col.hvym_meta_data)):
+            item = col.hvym_meta_data[i]
+            mats = [m.mat_ref for m in item.mat_set] + [item.mat_ref]
+            if any(m.as_pointer() in mat_keys for m in mats if m != None):
+                markItemDirty(col, i)
+
+def extract_mat_ref(value):
     mat_props = {'name': value.name, 'color': color_to_hex(value.diffuse_color), 'type': 'Material'}
 
     for node in value.node_tree.nodes:
@@ -944,6 +1998,165 @@ def create_mat_ref(value):
     return mat_props
 
 
+# -------------------------------------------------------------------
+#   Compiled Serializers
+# -------------------------------------------------------------------
+# Each PropertyGroup (or ID) class gets its field list built once from
+# bl_rna: plain bool, int, float, string and enum properties are copied
+# as is, the fields below go through their converter. Everything else
+# (vectors, other pointers and collections) is left out.
+SERIALIZERS = {}
+SERIALIZE_PLAIN_TYPES = ('BOOLEAN', 'INT', 'FLOAT', 'STRING', 'ENUM')
+
+def children_field(item, value):
+    arr = []
+    for obj in value:
+        arr.append({'name': obj.name, 'type': obj.type})
+
+    return arr
+
+def model_ref_field(item, value):
+    if value != None:
+        value = {'name': value.name}
+
+    return value
+
+def action_set_field(item, value):
+    a_set = []
+    for a in value:
+        a_set.append(a.string)
+
+    return a_set
+
+def behavior_set_field(item, value):
+    b_set = []
+    for b in value:
+        b_data = {
+            'name': b.type, 
+            'behavior': b.behavior_type,
+            'use_method': b.use_method,
+            'method': b.method
+            }
+        b_set.append(b_data)
+
+    return b_set
+
+def mesh_set_field(item, value):
+    m_set = []
+    for m in value:
+        if m.model_ref != None:
+            visible = not m.model_ref.hide_select
+            mesh_data = {
+                    'name': m.model_ref.name,
+                    'visible': visible
+                    }
+            m_set.append(mesh_data)
+
+    return m_set
+
+def morph_set_field(item, value):
+    m_set = []
+    for m in value:
+        morph_data = {
+            'name': m.name,
+            'default': m.float_default,
+            'min': m.float_min,
+            'max': m.float_max
+        }
+        m_set.append(morph_data)
+
+    return m_set
+
+def anim_blending_field(item, value):
+    if hasattr( item, 'model_ref' ) and item.model_ref != None and item.model_ref.animation_data != None:
+        item.anim_blending = item.model_ref.animation_data.action_blend_type
+        value = item.anim_blending
+
+    return value
+
+def mat_ref_field(item, value):
+    if value != None:
+        value = create_mat_ref(value)
+        handle_mat_props(item, value)
+
+    return value
+
+def mat_set_field(item, value):
+    mat_sets = []
+    for m in value:
+        if m.mat_ref != None:
+            mat_sets.append(create_mat_ref(m.mat_ref))
+
+    return mat_sets
+
+def color_field(item, value):
+    return color_to_hex(value)
+
+SERIALIZE_CONVERTERS = {
+    'children': children_field,
+    'model_ref': model_ref_field,
+    'action_set': action_set_field,
+    'behavior_set': behavior_set_field,
+    'mesh_set': mesh_set_field,
+    'morph_set': morph_set_field,
+    'anim_blending': anim_blending_field,
+    'mat_ref': mat_ref_field,
+    'mat_set': mat_set_field,
+    'menu_primary_color': color_field,
+    'menu_secondary_color': color_field,
+    'menu_text_color': color_field,
+}
+
+def compile_serializer(bl_rna):
+    """ Builds the sorted (attr, converter) field list for a class,
+    converter is None for fields copied as is.
+    """
+    fields = []
+
+    for prop in bl_rna.properties:
+        attr = prop.identifier
+        if attr in SERIALIZE_CONVERTERS:
+            fields.append((attr, SERIALIZE_CONVERTERS[attr]))
+        elif prop.type in SERIALIZE_PLAIN_TYPES and attr != 'rna_type':
+            if getattr(prop, 'array_length', 0) > 0 or getattr(prop, 'is_enum_flag', False):
+                continue
+            if prop.subtype == 'BYTE_STRING':
+                continue
+            fields.append((attr, None))
+
+    #object children are a python property, not part of bl_rna
+    if bl_rna.identifier == 'Object' and 'children' not in [f[0] for f in fields]:
+        fields.append(('children', children_field))
+
+    fields.sort(key=lambda f: f[0])
+
+    return fields
+
+def serializer_fields(item):
+    fields = SERIALIZERS.get(type(item))
+    if fields == None:
+        fields = compile_serializer(item.bl_rna)
+        SERIALIZERS[type(item)] = fields
+
+    return fields
+
+
+def property_group_item_to_dict(item):
+    item_result = {}
+
+    for attr, convert in serializer_fields(item):
+        value = getattr(item, attr)
+        if convert != None:
+            value = convert(item, value)
+            if value == None:
+                continue
+
+        item_result[attr] = value
+
+    return item_result
+
+
+@profiled
 def property_group_to_dict(pg):
     result = {}
     
@@ -951,98 +2164,7 @@ def property_group_to_dict(pg):
         return result 
         
     for i in range(len(pg)):
-        item_result = {}
-        
-        for attr in dir(pg[i]):
-            if hasattr( pg[i], attr ):
-                value = getattr(pg[i], attr)
-
-                if(attr == 'children'):
-                    arr = []
-                    for obj in value:
-                        arr.append({'name': obj.name, 'type': obj.type})
-
-                    value = arr
-
-                if(attr == 'model_ref'):
-                    if value != None:
-                        value = {'name': value.name}
-                if(attr == 'action_set'):
-                    if value != None:
-                        a_set = []
-                        for a in pg[i].action_set:
-                            a_set.append(a.string)
-                    value = a_set
-                if(attr == 'behavior_set'):
-                    if value != None:
-                        b_set = []
-                        for b in pg[i].behavior_set:
-                            b_data = {
-                                'name': b.type, 
-                                'behavior': b.behavior_type,
-                                'use_method': b.use_method,
-                                'method': b.method
-                                }
-                            b_set.append(b_data)
-
-                        value = b_set
-                if(attr == 'mesh_set'):
-                    if value != None:
-                        m_set = []
-                        for m in pg[i].mesh_set:
-                            if m.model_ref != None:
-                                visible = not m.model_ref.hide_select
-                                mesh_data = {
-                                        'name': m.model_ref.name,
-                                        'visible': visible
-                                        }
-                                m_set.append(mesh_data)
-
-                        value = m_set
-                if(attr == 'morph_set'):
-                    if value != None:
-                        m_set = []
-                        for m in pg[i].morph_set:
-                            morph_data = {
-                                'name': m.name,
-                                'default': m.float_default,
-                                'min': m.float_min,
-                                'max': m.float_max
-                            }
-                            m_set.append(morph_data)
-                        value = m_set
-
-                if(attr == 'anim_blending'):
-                    if hasattr( pg[i], 'model_ref' ) and pg[i].model_ref != None and pg[i].model_ref.animation_data != None:
-                        pg[i].anim_blending = pg[i].model_ref.animation_data.action_blend_type
-
-                if(attr == 'mat_ref'):
-                    if value != None:
-                        value = create_mat_ref(value)
-                        handle_mat_props(pg[i], value)
-
-                if(attr == 'mat_set'):
-                    if value != None:
-                        mat_sets = []
-                        for m in value:
-                            if m.mat_ref != None:
-                                mat_sets.append(create_mat_ref(m.mat_ref))
-
-                        value = mat_sets
-
-                if(attr == 'menu_primary_color' or attr == 'menu_secondary_color' or attr == 'menu_text_color'):
-                    if value != None:
-                        value = color_to_hex(value)
-                
-                if isinstance(value, (str, int, float, bool, list, dict)):
-                    try:
-                        json.dumps(value)   # Try converting value into json format
-                    except (TypeError, OverflowError):  # If it fails due to these reasons
-                        pass  # Ignore this value
-                    else:
-                        item_result[attr] = value  # Only add the value to `item_result` if it is serializable.
-            
-        result[i] = item_result
+        result[i] = property_group_item_to_dict(pg[i])
 
     
     return result
@@ -1052,87 +2174,953 @@ def property_group_to_json(pg):
     # print(json.dumps(property_group_to_dict(pg)))
     return json.dumps(property_group_to_dict(pg))
 
+# -------------------------------------------------------------------
+#   In-process Parsers
+# -------------------------------------------------------------------
+# Python versions of the cli 'parse-blender-hvym-collection' and
+# 'parse-blender-hvym-interactables' commands. They take the dicts built
+# by property_group_to_dict directly, so no json goes through argv.
+# PARSER_MODE picks the implementation used by updateNftData:
+#   'cli'         - external cli only, the default
+#   'python'      - in-process parsers, the cli is used if they fail
+#   'conformance' - run both, print any difference, keep the cli result
+# The cli stays the reference implementation, 'python' is opt in until
+# conformance runs show no differences.
+PARSER_MODE = 'cli'
+
+def widget_type_key(item):
+    result = 'meter'
+    if item['trait_type'] == 'property':
+        result = 'prop_slider_type'
+    elif item['trait_type'] == 'mat_set' or item['trait_type'] == 'mesh_set':
+        result = 'prop_selector_type'
+    elif item['trait_type'] == 'anim':
+        result = 'prop_toggle_type'
+        if item['anim_loop'] == 'Clamp':
+            result = 'prop_anim_slider_type'
+    elif item['trait_type'] == 'mesh':
+        result = 'prop_toggle_type'
+    elif item['trait_type'] == 'mat_prop' or item['trait_type'] == 'morph_set':
+        result = 'prop_multi_widget_type'
+
+    return result
+
+def parse_value_prop(item):
+    prefix = 'float_' if item['prop_value_type'] == 'Float' else 'int_'
+
+    return {
+        'widget_type': item[widget_type_key(item)],
+        'show': item['show'],
+        'prop_value_type': item['prop_value_type'],
+        'prop_action_type': item['prop_action_type'],
+        'immutable': item['prop_immutable'],
+        'default': item[prefix+'default'],
+        'min': item[prefix+'min'],
+        'max': item[prefix+'max'],
+        'amount': item[prefix+'amount'],
+        'behaviors': item['behavior_set']
+    }
+
+def parse_hvym_collection(collection_name, collection_type, collection_id, collection_data, menu_data, nodes, action_data):
+    """ In-process equivalent of the cli 'parse-blender-hvym-collection'.
+    """
+    val_props = {}
+    text_val_props = {}
+    call_props = {}
+    mesh_props = {}
+    mesh_sets = {}
+    morph_sets = {}
+    anim_props = {}
+    mat_props = {}
+    mat_sets = {}
+    col_menu = {}
+    action_props = {}
+    prop_label_data = {}
+
+    for i in collection_data:
+        item = collection_data[i]
+        trait_type = item['trait_type']
+        name = item['type']
+
+        if trait_type == 'property':
+            val_props[name] = parse_value_prop(item)
+
+        elif trait_type == 'text':
+            text_val_props[name] = {
+                'widget_type': item['prop_text_widget_type'],
+                'show': item['show'],
+                'immutable': item['prop_immutable'],
+                'text': item['text_value'],
+                'behaviors': item['behavior_set']
+            }
+
+        elif trait_type == 'call':
+            call_props[name] = {'name': name, 'call_param': item['call_param']}
+
+        elif trait_type == 'mesh':
+            if 'model_ref' in item:
+                mesh_props[name] = {
+                    'widget_type': item[widget_type_key(item)],
+                    'show': item['show'],
+                    'name': item['model_ref']['name'],
+                    'visible': item['visible']
+                }
+
+        elif trait_type == 'mesh_set':
+            mesh_sets[name] = {
+                'widget_type': item[widget_type_key(item)],
+                'show': item['show'],
+                'set': item['mesh_set'],
+                'selected_index': 0
+            }
+
+        elif trait_type == 'morph_set':
+            morph_sets[name] = {
+                'widget_type': item[widget_type_key(item)],
+                'show': item['show'],
+                'set': item['morph_set'],
+                'selected_index': 0,
+                'model_ref': item.get('model_ref', {})
+            }
+
+        elif trait_type == 'anim':
+            anim_props[name] = {
+                'widget_type': item[widget_type_key(item)],
+                'show': item['show'],
+                'name': name,
+                'loop': item['anim_loop'],
+                'start': item['anim_start'],
+                'end': item['anim_end'],
+                'blending': item['anim_blending'],
+                'weight': item['anim_weight'],
+                'play': item['anim_play'],
+                'model_ref': item.get('model_ref', {})
+            }
+
+        elif trait_type == 'mat_prop':
+            mat_props[name] = {
+                'widget_type': item[widget_type_key(item)],
+                'show': item['show'],
+                'name': name,
+                'type': item['mat_type'],
+                'emissive': item['mat_emissive'],
+                'reflective': item['mat_reflective'],
+                'iridescent': item['mat_iridescent'],
+                'sheen': item['mat_sheen'],
+                'mat_ref': item.get('mat_ref', {}),
+                'save_data': {}
+            }
+
+        elif trait_type == 'mat_set':
+            mat_sets[name] = {
+                'widget_type': item[widget_type_key(item)],
+                'show': item['show'],
+                'set': item['mat_set'],
+                'mesh_set': item['mesh_set'],
+                'material_id': item['material_id'],
+                'selected_index': 0
+            }
+
+        prop_label_data = {
+            'value_prop_label': item['value_prop_label'],
+            'text_prop_label': item['text_prop_label'],
+            'call_prop_label': item['call_prop_label'],
+            'mesh_prop_label': item['mesh_prop_label'],
+            'mat_prop_label': item['mat_prop_label'],
+            'anim_prop_label': item['anim_prop_label'],
+            'mesh_set_label': item['mesh_set_label'],
+            'morph_set_label': item['morph_set_label'],
+            'mat_set_label': item['mat_set_label']
+        }
+
+    for i in menu_data:
+        menu = menu_data[i]
+        if menu['collection_id'] == collection_id:
+            col_menu = {
+                'name': menu['menu_name'],
+                'primary_color': menu['menu_primary_color'],
+                'secondary_color': menu['menu_secondary_color'],
+                'text_color': menu['menu_text_color'],
+                'alignment': menu['menu_alignment']
+            }
+
+    for i in action_data:
+        action = action_data[i]
+        interaction = action['anim_interaction_type']
+        if action['trait_type'] == 'mesh_action':
+            interaction = action['mesh_interaction_type']
+
+        action_props[action['type']] = {
+            'anim_type': action['trait_type'],
+            'set': action['action_set'],
+            'interaction': interaction,
+            'sequence': action['sequence_type'],
+            'additive': action['additive'],
+            'model_ref': action.get('model_ref', {})
+        }
+
+    return {
+        'collectionName': collection_name,
+        'collectionType': collection_type,
+        'valProps': val_props,
+        'textValProps': text_val_props,
+        'callProps': call_props,
+        'meshProps': mesh_props,
+        'meshSets': mesh_sets,
+        'morphSets': morph_sets,
+        'animProps': anim_props,
+        'matProps': mat_props,
+        'materialSets': mat_sets,
+        'menuData': col_menu,
+        'propLabelData': prop_label_data,
+        'nodes': nodes,
+        'actionProps': action_props
+    }
+
+def parse_hvym_interactables(obj_data):
+    """ In-process equivalent of the cli 'parse-blender-hvym-interactables'.
+    """
+    result = {}
+
+    for i in obj_data:
+        obj = obj_data[i]
+        if not obj.get('hvym_interactable', False):
+            continue
+
+        result[obj['name']] = {
+            'interactable': obj['hvym_interactable'],
+            'has_return': obj['hvym_interactable_has_return'],
+            'interaction_type': obj['hvym_mesh_interaction_type'],
+            'selector_dir': obj['hvym_interactable_selector_dir'],
+            'name': obj['hvym_mesh_interaction_name'],
+            'call': obj['hvym_mesh_interaction_call'],
+            'default_text': obj['hvym_mesh_interaction_default_text'],
+            'text_scale': obj['hvym_mesh_interaction_text_scale'],
+            'text_wrap': obj['hvym_mesh_interaction_text_wrap'],
+            'text_behavior': obj['hvym_interactable_behavior'],
+            'param_type': obj['hvym_mesh_interaction_param_type'],
+            'slider_param_type': obj['hvym_mesh_interaction_slider_param_type'],
+            'toggle_param_type': obj['hvym_mesh_interaction_toggle_param_type'],
+            'string_param': obj['hvym_mesh_interaction_string_param'],
+            'int_param': obj['hvym_mesh_interaction_int_param'],
+            'float_param': obj['hvym_mesh_interaction_float_param'],
+            'toggle_state': obj['hvym_mesh_interaction_toggle_state'],
+            'toggle_int': obj['hvym_mesh_interaction_toggle_int'],
+            'int_default': obj['hvym_mesh_interaction_int_default'],
+            'int_min': obj['hvym_mesh_interaction_int_min'],
+            'int_max': obj['hvym_mesh_interaction_int_max'],
+            'float_default': obj['hvym_mesh_interaction_float_default'],
+            'float_min': obj['hvym_mesh_interaction_float_min'],
+            'float_max': obj['hvym_mesh_interaction_float_max']
+        }
+
+    return result
+
+def diff_parsed(a, b, key_path=''):
+    """ List the paths where two parser outputs differ.
+    """
+    diffs = []
+    if isinstance(a, dict) and isinstance(b, dict):
+        for key in sorted(set(a.keys()) | set(b.keys()), key=str):
+            if key not in a or key not in b:
+                diffs.append(f'{key_path}/{key}: only in {"cli" if key in b else "python"}')
+            else:
+                diffs += diff_parsed(a[key], b[key], f'{key_path}/{key}')
+    elif isinstance(a, list) and isinstance(b, list) and len(a) == len(b):
+        for i in range(len(a)):
+            diffs += diff_parsed(a[i], b[i], f'{key_path}[{i}]')
+    elif a != b:
+        diffs.append(f'{key_path}: python={a!r} cli={b!r}')
+
+    return diffs
+
+def cli_parse_params(command, parse_args):
+    return [command]+[a if isinstance(a, str) else json.dumps(a) for a in parse_args]
+
+def parse_with_mode(command, parse_func, parse_args):
+    """ Run a parser the way PARSER_MODE selects, command is the
+    matching cli command.
+    """
+    if PARSER_MODE == 'python':
+        try:
+            return parse_func(*parse_args)
+        except (KeyError, TypeError) as e:
+            print(f"In-process {command} failed ({e!r}), using the cli.")
+
+    cli_result = call_cli_payload(cli_parse_params(command, parse_args))
+
+    if PARSER_MODE == 'conformance':
+        try:
+            # round trip through json so keys and tuples compare like the cli output
+            py_result = json.loads(json.dumps(parse_func(*parse_args)))
+        except (KeyError, TypeError) as e:
+            print(f"{command} conformance: in-process parser failed ({e!r})")
+            return cli_result
+
+        diffs = diff_parsed(py_result, cli_result)
+        if len(diffs) > 0:
+            print(f"{command} conformance: {len(diffs)} difference(s)")
+            for d in diffs:
+                print('    '+d)
+
+    return cli_result
+
+
 def UpdateAccountInfo(context):
-    account = ast.literal_eval(run_command([CLI, f'icp-account-info']))
+    account = call_cli_json(['icp-account-info'])
     context.scene.hvym_account_name = account['active_id']
     context.scene.hvym_address = account['principal']
     prompt(f'Active Account set to: {context.scene.hvym_account_name}')
 
-def updateNftData(context):
-    #Update all the props on any change
-    #put them into a single structure
-    if context.collection.name == 'Scene Collection':
+# -------------------------------------------------------------------
+#   Dirty Tracking
+# -------------------------------------------------------------------
+NFT_SCENE_PARTS = ('contract', 'menu', 'actions', 'interactables')
+ITEM_PATH = re.compile(r'hvym_meta_data\[(\d+)\]')
+
+class NftDataCache:
+    """ Keeps track of which parts of the nftData are out of date, along
+    with the serialized item dicts of the parts that are not, so that
+    updateNftData only redoes what was edited. Menu and action data go
+    into every collection, so changing them bumps a revision that marks
+    all collections for re-assembly. Object names, visibility and
+    collection membership don't go through the update callbacks, their
+    state is kept in object_refs and compared by check_objects.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.scene_parts = set(NFT_SCENE_PARTS)
+        self.collections = set()
+        self.items = {}
+        self.item_data = {}
+        self.scene_data = {}
+        self.revision = 0
+        self.assembled = {}
+        self.generation = 0
+        self.collected = {}
+        self.object_refs = {}
+
+    def mark_loaded(self, keys, stale):
+        """ The nftData was just read from a file, everything it holds is
+        up to date except the parts listed as stale when it was saved.
+        """
+        for key in keys:
+            if key in stale:
+                continue
+            if key in NFT_SCENE_PARTS:
+                self.scene_parts.discard(key)
+            else:
+                self.assembled[key] = self.revision
+
+    def stale_keys(self, keys):
+        """ The keys of nftData that are older than the scene.
+        """
+        stale = [part for part in ('contract', 'interactables') if part in self.scene_parts]
+        stale.extend(self.collections)
+        stale.extend(self.collected.keys())
+        stale.extend(key for key in keys if key not in NFT_SCENE_PARTS and key != 'project' and self.is_dirty(key))
+
+        return sorted(set(stale))
+
+    def collect(self, keys):
+        """ Record that keys were serialized for parsing, returns the
+        generation apply_nft_results checks to drop outdated results.
+        """
+        self.generation += 1
+        for key in keys:
+            self.collected[key] = self.generation
+
+        return self.generation
+
+    def mark_scene(self, part):
+        self.scene_parts.add(part)
+        if part == 'menu' or part == 'actions':
+            self.revision += 1
+
+    def mark_collection(self, hvym_id):
+        """ The item list changed shape, re-serialize all its items.
+        """
+        self.collections.add(hvym_id)
+        self.item_data.pop(hvym_id, None)
+        self.items.pop(hvym_id, None)
+
+    def mark_item(self, hvym_id, index):
+        self.collections.add(hvym_id)
+        self.items.setdefault(hvym_id, set()).add(index)
+
+    def check_objects(self, collection):
+        """ Mark the items whose referenced objects were renamed or had
+        their visibility or blending changed, and the collection if its
+        objects changed. The first check of a collection only records
+        the state.
+        """
+        hvym_id = collection.hvym_id
+        nodes = tuple((obj.name, obj.type) for obj in collection.objects)
+        pg = collection.hvym_meta_data
+        states = [item_object_state(pg[i]) for i in range(len(pg))]
+        refs = self.object_refs.get(hvym_id)
+        self.object_refs[hvym_id] = (nodes, states)
+        if refs == None:
+            return
+
+        if refs[0] != nodes:
+            self.collections.add(hvym_id)
+        for i in range(min(len(states), len(refs[1]))):
+            if states[i] != refs[1][i]:
+                self.mark_item(hvym_id, i)
+
+    def is_dirty(self, hvym_id):
+        return hvym_id in self.collections or self.assembled.get(hvym_id) != self.revision
+
+    def collection_items(self, collection):
+        """ property_group_to_dict of the collection meta data, only
+        re-serializing the items marked dirty.
+        """
+        hvym_id = collection.hvym_id
+        pg = collection.hvym_meta_data
+        data = self.item_data.get(hvym_id)
+        dirty = self.items.pop(hvym_id, set())
+
+        if data is None:
+            data = property_group_to_dict(pg)
+        else:
+            for i in [i for i in data if i >= len(pg)]:
+                del data[i]
+            dirty.update(range(len(data), len(pg)))
+            for i in sorted(dirty):
+                if i < len(pg):
+                    data[i] = property_group_item_to_dict(pg[i])
+
+        self.item_data[hvym_id] = data
+        return data
+
+    def scene_part(self, part, pg):
+        """ property_group_to_dict of a scene level group, cached until
+        the part is marked dirty.
+        """
+        if part in self.scene_parts or part not in self.scene_data:
+            self.scene_data[part] = property_group_to_dict(pg)
+            self.scene_parts.discard(part)
+
+        return self.scene_data[part]
+
+    def assembled_collection(self, hvym_id):
+        self.collections.discard(hvym_id)
+        self.assembled[hvym_id] = self.revision
+
+
+NFT_CACHE = NftDataCache()
+
+def item_object_state(item):
+    """ The object data the serializers read from an item's model_ref
+    and mesh_set.
+    """
+    state = []
+    obj = item.model_ref
+    if obj != None:
+        blend = obj.animation_data.action_blend_type if obj.animation_data != None else None
+        state.append((obj.name, blend))
+    for m in item.mesh_set:
+        if m.model_ref != None:
+            state.append((m.model_ref.name, m.model_ref.hide_select))
+
+    return tuple(state)
+
+def checkObjectRefs(context=None):
+    for col in bpy.data.collections:
+        if col.hvym_id != '':
+            NFT_CACHE.check_objects(col)
+
+def markCollectionDirty(collection):
+    setCollectionId(collection)
+    NFT_CACHE.mark_collection(collection.hvym_id)
+
+def markItemDirty(collection, index):
+    setCollectionId(collection)
+    NFT_CACHE.mark_item(collection.hvym_id, index)
+
+def markDirty(owner):
+    """ Flag the part of the nftData that owner, the ID or property
+    group an update callback fired on, belongs to.
+    """
+    id_data = owner.id_data
+
+    if isinstance(id_data, bpy.types.Collection):
+        match = ITEM_PATH.match(owner.path_from_id())
+        if match:
+            markItemDirty(id_data, int(match.group(1)))
+        else:
+            setCollectionId(id_data)
+            NFT_CACHE.collections.add(id_data.hvym_id)
+
+    elif isinstance(id_data, bpy.types.Object):
+        if INTERACTABLES.update(id_data) or id_data.hvym_interactable:
+            NFT_CACHE.mark_scene('interactables')
+
+    elif isinstance(id_data, bpy.types.Scene):
+        prop_path = owner.path_from_id()
+        if prop_path.startswith('hvym_menu_meta_data'):
+            NFT_CACHE.mark_scene('menu')
+        elif prop_path.startswith('hvym_action_meta_data'):
+            NFT_CACHE.mark_scene('actions')
+        else:
+            NFT_CACHE.mark_scene('contract')
+
+@persistent
+def post_undo(scene):
+    #values restored by undo don't fire update callbacks
+    NFT_CACHE.clear()
+    INTERACTABLES.clear()
+    MAT_REF_CACHE.clear()
+    MENU_INDEX.clear()
+    bumpExportRevision()
+
+
+# -------------------------------------------------------------------
+#   Interactables Index
+# -------------------------------------------------------------------
+class InteractablesIndex:
+    """ Names of the scene objects with hvym_interactable set, kept up to
+    date from the MESH_PROPS update callbacks and the depsgraph handler,
+    so building the interactables data doesn't touch every object.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self, object_count=-1):
+        """ Drop the index, object_count is the scene object count it
+        was dropped at, so the depsgraph handler doesn't drop it again.
+        """
+        self.names = None
+        self.object_count = object_count
+
+    def update(self, obj):
+        """ Add or drop obj, returns True if the set of interactable
+        objects changed, or isn't known yet.
+        """
+        if self.names == None:
+            return True
+
+        if obj.hvym_interactable and obj.name not in self.names:
+            self.names.append(obj.name)
+            return True
+        elif not obj.hvym_interactable and obj.name in self.names:
+            self.names.remove(obj.name)
+            return True
+
+        return False
+
+    def objects(self, scene):
+        if self.names == None or self.object_count != len(scene.objects):
+            self.names = [obj.name for obj in scene.objects if obj.hvym_interactable]
+            self.object_count = len(scene.objects)
+
+        result = []
+        for name in list(self.names):
+            obj = scene.objects.get(name)
+            if obj == None or not obj.hvym_interactable:
+                #renamed or deleted since it was indexed
+                self.clear()
+                return self.objects(scene)
+            result.append(obj)
+
+        return result
+
+    def to_dict(self, scene):
+        """ Same layout as property_group_to_dict, with only the
+        interaction fields of the interactable objects.
+        """
+        result = {}
+
+        for i, obj in enumerate(self.objects(scene)):
+            obj_data = {}
+            for attr in INTERACTABLE_FIELDS:
+                obj_data[attr] = getattr(obj, attr)
+            result[i] = obj_data
+
+        return result
+
+
+INTERACTABLES = InteractablesIndex()
+
+@persistent
+def post_depsgraph_update(scene, depsgraph):
+    changed = False
+    objects_changed = False
+
+    if INTERACTABLES.object_count != len(scene.objects):
+        #objects were added or deleted
+        INTERACTABLES.clear(len(scene.objects))
+        changed = True
+        objects_changed = True
+
+    for update in depsgraph.updates:
+        if isinstance(update.id, EXPORT_TYPES):
+            bumpExportRevision()
+
+        if isinstance(update.id, bpy.types.Object):
+            if INTERACTABLES.update(update.id.original):
+                changed = True
+            if not update.is_updated_transform and not update.is_updated_geometry:
+                #renames, visibility and collection links,
+                #not edit mode or sculpt ticks
+                objects_changed = True
+        elif isinstance(update.id, (bpy.types.Material, bpy.types.ShaderNodeTree)):
+            invalidate_mat_ref(update.id.original)
+
+    if changed:
+        NFT_CACHE.mark_scene('interactables')
+
+    if objects_changed:
+        #checked once the updates settle
+        UPDATE_SCHEDULER.add(None, scene, ('objects',))
+
+    if MENU_INDEX.object_count != len(bpy.data.objects):
+        MENU_INDEX.clear()
+
+
+# -------------------------------------------------------------------
+#   Menu Index
+# -------------------------------------------------------------------
+class MenuIndex:
+    """ Maps collection names to the name of their menu transform, the
+    object in the collection with a menu index. Found from the objects of
+    the collection on first use, and dropped when objects are added or
+    deleted, on undo and on file load. Duplicated transforms share the
+    menu id, so it is never looked up across collections.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.menus = {}
+        self.object_count = -1
+
+    def find(self, collection):
+        transform = None
+        for obj in collection.all_objects:
+            if obj.hvym_menu_index >= 0:
+                transform = obj
+
+        self.menus[collection.name] = transform.name if transform != None else None
+        self.object_count = len(bpy.data.objects)
+        return transform
+
+    def get(self, collection):
+        """ (menu transform object, menu index) of the collection,
+        or None if it has no menu transform.
+        """
+        if collection.name not in self.menus:
+            obj = self.find(collection)
+        elif self.menus[collection.name] == None:
+            obj = None
+        else:
+            obj = collection.all_objects.get(self.menus[collection.name])
+            if obj == None or obj.hvym_menu_index < 0:
+                #renamed, unlinked or deleted since it was indexed
+                obj = self.find(collection)
+
+        if obj == None:
+            return None
+
+        return (obj, obj.hvym_menu_index)
+
+    def set(self, collection, obj):
+        self.menus[collection.name] = obj.name
+
+    def transforms(self):
+        """ The menu transforms of all collections, each object once.
+        """
+        found = {}
+        for col in bpy.data.collections:
+            menu = self.get(col)
+            if menu != None:
+                found[menu[0].name] = menu[0]
+
+        return list(found.values())
+
+
+MENU_INDEX = MenuIndex()
+
+
+@profiled
+def updateNftData(context, collection=None):
+    #Update the dirty parts of the nft data
+    #and merge them into the scene structure
+    if collection == None:
+        collection = context.collection
+
+    if collection.name == 'Scene Collection':
         return
-        
-    hvym_meta_data = context.collection.hvym_meta_data
-    hvym_action_meta_data = context.scene.hvym_action_meta_data
-    setCollectionId(context.collection)
-    nodes = []
-
-    for obj in context.collection.objects:
-        node = {'name': obj.name, 'type': obj.type}
-        nodes.append(node)
-
-    params = [
-        'contract-data',
-        context.scene.hvym_mintable,
-        context.scene.hvym_nft_type, 
-        context.scene.hvym_nft_chain, 
-        round(context.scene.hvym_nft_price, 4), 
-        round(context.scene.hvym_prem_nft_price, 4), 
-        context.scene.hvym_max_supply, 
-        context.scene.hvym_minter_type,
-        context.scene.hvym_minter_name,
-        context.scene.hvym_minter_description,
-        context.scene.hvym_minter_image,
-        context.scene.hvym_minter_version,
-        context.scene.hvym_enable_context_menu,
-        context.scene.hvym_menu_indicator_shown
-    ]
 
-    context.scene.hvym_collections_data.nftData['contract'] =json.loads(call_cli(params))
-
-    params = [
-        'parse-blender-hvym-collection', 
-        context.collection.name, 
-        context.collection.hvym_collection_type, 
-        context.collection.hvym_id, 
-        property_group_to_json(hvym_meta_data), 
-        property_group_to_json(context.scene.hvym_menu_meta_data), 
-        json.dumps(nodes),
-        property_group_to_json(hvym_action_meta_data)
-    ]
+    setCollectionId(collection)
+    checkObjectRefs()
+    collections = [collection]
+    for col in bpy.data.collections:
+        if col != collection and col.hvym_id in NFT_CACHE.collections:
+            collections.append(col)
+
+    contract_params, jobs = collect_nft_jobs(context.scene, collections)
+    try:
+        results = run_nft_jobs(contract_params, jobs)
+    except Exception:
+        requeue_nft_jobs(contract_params, jobs)
+        raise
+
+    apply_nft_results(context.scene, results)
+
+def collect_nft_jobs(scene, collections):
+    """ Main thread half of updateNftData, serializes the dirty parts of
+    collections and the scene. Returns the contract params and the
+    parse jobs, these only hold plain data and can run on any thread.
+    """
+    nft_data = scene.hvym_collections_data.nftData
+    contract_params = None
+    jobs = []
+
+    if 'contract' in NFT_CACHE.scene_parts or 'contract' not in nft_data:
+        NFT_CACHE.scene_parts.discard('contract')
+        contract_params = [
+            'contract-data',
+            scene.hvym_mintable,
+            scene.hvym_nft_type, 
+            scene.hvym_nft_chain, 
+            round(scene.hvym_nft_price, 4), 
+            round(scene.hvym_prem_nft_price, 4), 
+            scene.hvym_max_supply, 
+            scene.hvym_minter_type,
+            scene.hvym_minter_name,
+            scene.hvym_minter_description,
+            scene.hvym_minter_image,
+            scene.hvym_minter_version,
+            scene.hvym_enable_context_menu,
+            scene.hvym_menu_indicator_shown
+        ]
+
+    for col in collections:
+        if not NFT_CACHE.is_dirty(col.hvym_id) and col.hvym_id in nft_data:
+            continue
+
+        nodes = []
+        for obj in col.objects:
+            node = {'name': obj.name, 'type': obj.type}
+            nodes.append(node)
+
+        collection_args = (
+            col.name,
+            col.hvym_collection_type,
+            col.hvym_id,
+            dict(NFT_CACHE.collection_items(col)),
+            NFT_CACHE.scene_part('menu', scene.hvym_menu_meta_data),
+            nodes,
+            NFT_CACHE.scene_part('actions', scene.hvym_action_meta_data)
+        )
+        jobs.append((col.hvym_id, 'parse-blender-hvym-collection', parse_hvym_collection, collection_args))
+        NFT_CACHE.assembled_collection(col.hvym_id)
+
+    if 'interactables' in NFT_CACHE.scene_parts or 'interactables' not in nft_data:
+        NFT_CACHE.scene_parts.discard('interactables')
+        interactables_args = (INTERACTABLES.to_dict(scene),)
+        jobs.append(('interactables', 'parse-blender-hvym-interactables', parse_hvym_interactables, interactables_args))
+
+    keys = [job[0] for job in jobs]
+    if contract_params != None:
+        keys.append('contract')
+    NFT_CACHE.collect(keys)
+
+    return contract_params, jobs
+
+def run_nft_jobs(contract_params, jobs):
+    """ Parse the collected jobs, returns the new nftData entries by key.
+    """
+    results = {}
+    if PARSER_MODE == 'cli':
+        calls = [cli_parse_params(command, args) for key, command, parse_func, args in jobs]
+        if contract_params != None:
+            calls.insert(0, contract_params)
+
+        payloads = [cli_payload(call) for call in CLI_WORKER.batch(calls)]
+
+        if contract_params != None:
+            results['contract'] = payloads.pop(0)
+        for job, payload in zip(jobs, payloads):
+            results[job[0]] = payload
+    else:
+        if contract_params != None:
+            results['contract'] = call_cli_payload(contract_params)
+        for key, command, parse_func, args in jobs:
+            results[key] = parse_with_mode(command, parse_func, args)
+
+    return results
 
-    #print(json.loads(call_cli(params)))
+def apply_nft_results(scene, results, generation=None):
+    """ Store parsed results in the nftData. With a generation, results
+    whose key was collected again since are left out.
+    """
+    nft_data = scene.hvym_collections_data.nftData
+    for key, value in results.items():
+        if generation != None and NFT_CACHE.collected.get(key) != generation:
+            continue
+        nft_data[key] = value
+        NFT_CACHE.collected.pop(key, None)
 
-    context.scene.hvym_collections_data.nftData[context.collection.hvym_id] = json.loads(call_cli(params))
+    nft_data['project'] = {'name':scene.hvym_project_name, 'type':scene.hvym_project_type}
 
-    params = [
-        'parse-blender-hvym-interactables', 
-        property_group_to_json(bpy.context.scene.objects)
-    ]
+def requeue_nft_jobs(contract_params, jobs, generation=None):
+    """ Mark the parts of failed jobs dirty again.
+    """
+    if contract_params != None and (generation == None or NFT_CACHE.collected.get('contract') == generation):
+        NFT_CACHE.mark_scene('contract')
+
+    for key, command, parse_func, args in jobs:
+        if generation != None and NFT_CACHE.collected.get(key) != generation:
+            continue
+        if parse_func == parse_hvym_collection:
+            NFT_CACHE.collections.add(key)
+        else:
+            NFT_CACHE.mark_scene(key)
 
-    context.scene.hvym_collections_data.nftData['interactables'] = json.loads(call_cli(params))
-    # print(json.loads(call_cli(params)))
-    # print(property_group_to_json(bpy.context.scene.objects))
 
-    context.scene.hvym_collections_data.nftData['project'] = {'name':context.scene.hvym_project_name, 'type':context.scene.hvym_project_type}
+# -------------------------------------------------------------------
+#   Update Scheduler
+# -------------------------------------------------------------------
+def updateProjectType(context):
+    if context.scene.hvym_project_type == 'model':
+        context.scene.hvym_daemon_path = call_cli_cached(['icp-model-path'])
+        context.scene.hvym_mintable = False
+    elif context.scene.hvym_project_type == 'minter':
+        context.scene.hvym_daemon_path = call_cli_cached(['icp-minter-path'])
+        context.scene.hvym_mintable = True
+    elif context.scene.hvym_project_type=='custom':
+        context.scene.hvym_daemon_path = call_cli_cached(['icp-custom-client-path'])
+        context.scene.hvym_mintable = False
+
+    NFT_CACHE.mark_scene('contract')
+
+def updateMenuIndex(context, collection=None):
+    if collection == None:
+        collection = context.collection
+
+    if MENU_INDEX.get(collection) == None:
+        collection.hvym_menu_index = -1
+
+def findCollection(context, hvym_id):
+    if context.scene.collection.hvym_id == hvym_id:
+        return context.scene.collection
+
+    for col in bpy.data.collections:
+        if col.hvym_id == hvym_id:
+            return col
+
+    return None
+
+#tasks run in this order, the ones that need
+#a collection get the collection they were requested for
+UPDATE_TASKS = (
+    ('project', updateProjectType, False),
+    ('materials', RebuildMaterialSets, True),
+    ('menu', updateMenuIndex, True),
+    ('objects', checkObjectRefs, False),
+    ('nft', updateNftData, True),
+)
+
+class UpdateScheduler:
+    """ Collects the update work requested by update callbacks and
+    operators, merges repeated requests for the same collection, and
+    runs it once nothing new was requested for hvym_update_delay seconds.
+    """
+
+    def __init__(self):
+        self.pending = {}
+        self.delay = 0.25
+        self.last_request = 0
+        self.timer = self.run
+
+    def request(self, context, *tasks):
+        hvym_id = None
+        if context.collection != None:
+            setCollectionId(context.collection)
+            hvym_id = context.collection.hvym_id
+
+        self.add(hvym_id, context.scene, tasks)
+
+    def add(self, hvym_id, scene, tasks):
+        """ Queue tasks for the collection with hvym_id, or for no
+        collection if it is None. Doesn't write to any ID, so it is safe
+        to call from the depsgraph handler.
+        """
+        self.pending.setdefault(hvym_id, set()).update(tasks)
+        self.delay = scene.hvym_update_delay
+        self.last_request = time()
+
+        if not bpy.app.timers.is_registered(self.timer):
+            bpy.app.timers.register(self.timer, first_interval=self.delay)
+
+    def run(self):
+        wait = self.delay - (time() - self.last_request)
+        if wait > 0:
+            return wait
+
+        self.flush()
+        return None
+
+    def flush(self):
+        """ Run all pending work now.
+        """
+        if bpy.app.timers.is_registered(self.timer):
+            bpy.app.timers.unregister(self.timer)
+
+        pending = self.pending
+        self.pending = {}
+        context = bpy.context
+
+        for name, func, needs_collection in UPDATE_TASKS:
+            requested = [hvym_id for hvym_id, tasks in pending.items() if name in tasks]
+            if len(requested) == 0:
+                continue
+            try:
+                if not needs_collection:
+                    func(context)
+                    continue
+
+                for hvym_id in requested:
+                    collection = findCollection(context, hvym_id)
+                    if collection != None:
+                        func(context, collection)
+            except Exception as e:
+                print(f"Update task {name} failed: {e}")
+
+    def cancel(self):
+        if bpy.app.timers.is_registered(self.timer):
+            bpy.app.timers.unregister(self.timer)
+        self.pending = {}
+
+
+UPDATE_SCHEDULER = UpdateScheduler()
+
+def scheduleUpdate(context, *tasks):
+    UPDATE_SCHEDULER.request(context, *tasks)
+
+
+def onUpdateProject(self, context):
+    scheduleUpdate(context, 'project')
 
+def onUpdateAccountCacheTtl(self, context):
+    CLI_CACHE_TTL['icp-account-info'] = self.hvym_account_cache_ttl
 
-def onUpdateProject(self, context):
-    if context.scene.hvym_project_type == 'model':
-        context.scene.hvym_daemon_path = call_cli(['icp-model-path'])
-        context.scene.hvym_mintable = False
-    elif context.scene.hvym_project_type == 'minter':
-        context.scene.hvym_daemon_path = call_cli(['icp-minter-path'])
-        context.scene.hvym_mintable = True
-    elif context.scene.hvym_project_type=='custom':
-        context.scene.hvym_daemon_path = call_cli(['icp-custom-client-path'])
-        context.scene.hvym_mintable = False
+def onUpdateChain(self, context):
+    #cached cli answers belong to the previous network
+    CLI_CACHE.invalidate()
+    onUpdate(self, context)
 
 def onUpdate(self, context):
-    RebuildMaterialSets(context)
-    #updateNftData(context)
+    markDirty(self)
+    scheduleUpdate(context, 'materials', 'menu')
     #this flag is used when props are updated by the user
     #This is so values can be pulled in from built in props
     if hasattr(self, 'no_update') and self.no_update:
@@ -1154,13 +3142,6 @@ def onUpdate(self, context):
                     morph.value = self.float_default
 
 
-    for col in bpy.data.collections:
-        if len(col.objects) > 0:
-            for obj in col.objects:
-                if obj.hvym_menu_index < 0:
-                    context.collection.hvym_menu_index = -1
-
-
 def setEnum(tup, set_enum, default_enum):
 
     result = tup
@@ -1251,10 +3232,33 @@ def loadingMessage(msg):
     call_cli_threaded(['custom-loading-msg', f'{msg}'])
 
 def prompt(msg, wide=False):
-    run_command([CLI, 'custom-prompt', f'{msg}'])
+    run_prompt(['custom-prompt', f'{msg}'])
 
 def choicePrompt(msg):
-    return run_command([CLI, 'custom-choice-prompt', f'{msg}'])
+    return run_prompt(['custom-choice-prompt', f'{msg}'])
+
+def run_prompt(call_arr):
+    """ Dialogs stay open for as long as the user takes, so they run as
+    their own process instead of holding CLI_WORKER. The caller waits
+    for the answer anyway, so the process is run right here rather than
+    queued on a pool behind other calls. Returns the output, or None if
+    the dialog failed.
+    """
+    if not os.path.isfile(CLI):
+        return None
+
+    try:
+        result = run_cli_once(CLI, [str(a) for a in call_arr], cli_timeout(call_arr))
+    except OSError as e:
+        print(e)
+        return None
+
+    if not result.ok:
+        print("Command failed with error:", result.error)
+        return None
+
+    print(result.stdout)
+    return result.stdout
 
 
 PROPS = [
@@ -1262,7 +3266,7 @@ PROPS = [
         name='Chain',
         items=nftChains,
         description ="Chain to mint to, see docs for more detail.",
-        update=onUpdate)),
+        update=onUpdateChain)),
     ('hvym_nft_type', bpy.props.EnumProperty(
         name='NFT-Type',
         items=nftTypes,
@@ -1391,6 +3395,9 @@ MESH_PROPS = [
     ('hvym_mesh_interaction_toggle_int', bpy.props.IntProperty(name="On", description="Add default value.", default=0, update=onUpdate),)
 ]
 
+#the object fields parse-blender-hvym-interactables reads
+INTERACTABLE_FIELDS = ['name', 'type'] + [prop_name for (prop_name, _) in MESH_PROPS]
+
 
 class HVYM_MenuDataItem(bpy.types.PropertyGroup):
     """Group of properties representing per collection menu meta data."""
@@ -2231,27 +4238,27 @@ class HVYM_MENU_NewMenuTransform(bpy.types.Operator):
             if context.collection.name in [c.name for c in bpy.data.objects[active_obj.name].users_collection]:
                 context.active_object.select_set(False)
 
-        for obj in context.collection.all_objects:
-            if obj.hvym_menu_index >= 0:
-                transform = obj
+        menu = MENU_INDEX.get(context.collection)
+        if menu != None:
+            transform = menu[0]
 
         if transform == None:
             data_updated = False
             for data in menu_data:
                 if data.collection_id == hvym_id:
                     menu_data.remove(index)
+                    NFT_CACHE.mark_scene('menu')
                     data_updated = True
                     break
                 index+=1
 
             if data_updated:
-                for col in bpy.data.collections:
-                    if len(col.objects) > 0:
-                        for obj in col.objects:
-                            if obj.hvym_menu_index > index:
-                                obj.hvym_menu_index -=1
+                for obj in MENU_INDEX.transforms():
+                    if obj.hvym_menu_index > index:
+                        obj.hvym_menu_index -=1
                 
             data = context.scene.hvym_menu_meta_data.add()
+            NFT_CACHE.mark_scene('menu')
             data.menu_name = context.collection.name + ' Menu'
             data.collection_id = hvym_id
             data.menu_index = len(context.scene.hvym_menu_meta_data)-1
@@ -2262,6 +4269,7 @@ class HVYM_MENU_NewMenuTransform(bpy.types.Operator):
             context.active_object.empty_display_size = 1
             context.active_object.hvym_menu_index = data.menu_index
             context.collection.hvym_menu_index = data.menu_index
+            MENU_INDEX.set(context.collection, context.active_object)
 
         return{'FINISHED'}
 
@@ -2288,6 +4296,7 @@ class HVYM_LIST_AddTrackToActionProp(bpy.types.Operator):
 
             if(in_list == False):
                 action_set = item.action_set.add()
+                NFT_CACHE.mark_scene('actions')
                 action_set.string = action_name
                 item.set_index += 1
 
@@ -2315,6 +4324,7 @@ class HVYM_LIST_DeleteTrackFromActionProp(bpy.types.Operator):
                 item = context.scene.hvym_action_meta_data[hvym_action_list_index]
 
                 item.action_set.remove(item.set_index)
+                NFT_CACHE.mark_scene('actions')
                 item.set_index = min(max(0, item.set_index - 1), len(item.action_set) - 1)
 
 
@@ -2350,6 +4360,7 @@ class HVYM_LIST_MoveTrack(bpy.types.Operator):
 
         neighbor = index + (-1 if self.direction == 'UP' else 1)
         item.action_set.move(neighbor, index)
+        NFT_CACHE.mark_scene('actions')
         self.move_index(self)
 
         return{'FINISHED'}
@@ -2400,6 +4411,7 @@ class HVYM_LIST_NewActionPropItem(bpy.types.Operator):
             in_list = False
             active_track = ob.animation_data.nla_tracks.active    
             item = context.scene.hvym_action_meta_data.add()
+            NFT_CACHE.mark_scene('actions')
             for i in range(len(item.action_set)):
                 if (item.action_set[i].string == action_name):
                     in_list = True
@@ -2433,6 +4445,7 @@ class HVYM_LIST_NewActionMeshPropItem(bpy.types.Operator):
                     in_list = True
             if(in_list == False):      
                 item = context.scene.hvym_action_meta_data.add()
+                NFT_CACHE.mark_scene('actions')
                 item.trait_type = 'mesh_action'
                 item.type = '*'
                 action_set = item.action_set.add()
@@ -2462,6 +4475,7 @@ class HVYM_LIST_DeleteActionItem(bpy.types.Operator):
         item = ctx.hvym_action_meta_data[index]
 
         hvym_action_meta_data.remove(index)
+        NFT_CACHE.mark_scene('actions')
         context.scene.hvym_action_list_index = min(max(0, index - 1), len(hvym_action_meta_data) - 1)
 
         return{'FINISHED'}
@@ -2483,6 +4497,7 @@ class HVYM_LIST_NewBehaviorPropItem(bpy.types.Operator):
             return
 
         b_item = item.behavior_set.add()
+        markItemDirty(context.collection, context.collection.hvym_list_index)
         b_item.type = '*'
         b_item.values = 'Behavior'
 
@@ -2510,6 +4525,7 @@ class HVYM_LIST_DeleteBehaviorItem(bpy.types.Operator):
         index = item.behavior_set_index
 
         item.behavior_set.remove(index)
+        markItemDirty(context.collection, context.collection.hvym_list_index)
         item.behavior_set_index = min(max(0, index - 1), len(item.behavior_set) - 1)
 
         return{'FINISHED'}
@@ -2523,13 +4539,14 @@ class HVYM_LIST_NewPropItem(bpy.types.Operator):
 
     def execute(self, context):
         item = context.collection.hvym_meta_data.add()
+        markItemDirty(context.collection, len(context.collection.hvym_meta_data)-1)
         item.trait_type = 'property'
         item.type = '*'
         item.values = 'Value Property'
         item.int_default = 0
         item.int_min = 0
         item.int_max = 1
-        updateNftData(context)
+        scheduleUpdate(context, 'nft')
 
         return{'FINISHED'}
 
@@ -2542,10 +4559,11 @@ class HVYM_LIST_NewTextPropItem(bpy.types.Operator):
 
     def execute(self, context):
         item = context.collection.hvym_meta_data.add()
+        markItemDirty(context.collection, len(context.collection.hvym_meta_data)-1)
         item.trait_type = 'text'
         item.type = '*'
         item.values = 'Text Value Property'
-        updateNftData(context)
+        scheduleUpdate(context, 'nft')
 
         return{'FINISHED'}
 
@@ -2558,10 +4576,11 @@ class HVYM_LIST_NewCallItem(bpy.types.Operator):
 
     def execute(self, context):
         item = context.collection.hvym_meta_data.add()
+        markItemDirty(context.collection, len(context.collection.hvym_meta_data)-1)
         item.trait_type = 'call'
         item.type = '*'
         item.values = 'Call Property'
-        updateNftData(context)
+        scheduleUpdate(context, 'nft')
 
         return{'FINISHED'}
 
@@ -2578,12 +4597,13 @@ class HVYM_LIST_NewMeshItem(bpy.types.Operator):
 
     def execute(self, context):
         item = context.collection.hvym_meta_data.add()
+        markItemDirty(context.collection, len(context.collection.hvym_meta_data)-1)
         item.trait_type = 'mesh'
         item.type = '*'
         item.values = 'Object'
         item.model_ref = context.active_object
         item.visible = (not context.active_object.hide_get())
-        updateNftData(context)
+        scheduleUpdate(context, 'nft')
 
         return{'FINISHED'}
 
@@ -2599,13 +4619,14 @@ class HVYM_LIST_NewMeshSet(bpy.types.Operator):
 
     def execute(self, context):
         item = context.collection.hvym_meta_data.add()
+        markItemDirty(context.collection, len(context.collection.hvym_meta_data)-1)
         item.trait_type = 'mesh_set'
         item.type = '*'
         item.values = 'Mesh Set'
         mesh_item = item.mesh_set.add()
         mesh_item.model_ref = context.active_object
         mesh_item.visible = (not context.active_object.hide_get())
-        updateNftData(context)
+        scheduleUpdate(context, 'nft')
 
         return{'FINISHED'}
 
@@ -2629,11 +4650,12 @@ class HVYM_LIST_NewMeshSetItem(bpy.types.Operator):
             return
 
         mesh_item = item.mesh_set.add()
+        markItemDirty(context.collection, context.collection.hvym_list_index)
         mesh_item.type = '*'
         mesh_item.values = 'Mesh Set'
         mesh_item.model_ref = context.active_object
 
-        updateNftData(context)
+        scheduleUpdate(context, 'nft')
 
         return{'FINISHED'}
 
@@ -2671,12 +4693,13 @@ class HVYM_LIST_AddMeshSetItemToSet(bpy.types.Operator):
             return{'FINISHED'}
 
         mesh_item = item.mesh_set.add()
+        markItemDirty(context.collection, context.collection.hvym_list_index)
         mesh_item.type = '*'
         mesh_item.values = 'Mesh Set'
         mesh_item.model_ref = context.active_object
         mesh_item.visible = (not context.active_object.hide_get())
 
-        updateNftData(context)
+        scheduleUpdate(context, 'nft')
 
         return{'FINISHED'}
 
@@ -2701,9 +4724,10 @@ class HVYM_LIST_DeleteMeshSetItem(bpy.types.Operator):
         index = item.mesh_set_index
 
         item.mesh_set.remove(index)
+        markItemDirty(context.collection, context.collection.hvym_list_index)
         item.mesh_set_index = min(max(0, index - 1), len(item.mesh_set) - 1)
 
-        updateNftData(context)
+        scheduleUpdate(context, 'nft')
 
         return{'FINISHED'}
 
@@ -2719,11 +4743,12 @@ class HVYM_LIST_NewMorphSet(bpy.types.Operator):
 
     def execute(self, context):
         item = context.collection.hvym_meta_data.add()
+        markItemDirty(context.collection, len(context.collection.hvym_meta_data)-1)
         item.trait_type = 'morph_set'
         item.type = '*'
         item.values = 'Morph Set'
         item.model_ref = context.active_object
-        updateNftData(context)
+        scheduleUpdate(context, 'nft')
 
         return{'FINISHED'}
 
@@ -2742,9 +4767,10 @@ class HVYM_LIST_DeleteMorphSetItem(bpy.types.Operator):
         index = item.morph_set_index
 
         item.morph_set.remove(index)
+        markItemDirty(context.collection, context.collection.hvym_list_index)
         item.morph_set_index = min(max(0, index - 1), len(item.morph_set) - 1)
 
-        updateNftData(context)
+        scheduleUpdate(context, 'nft')
 
         return{'FINISHED'}
 
@@ -2761,6 +4787,7 @@ class HVYM_LIST_NewAnimItem(bpy.types.Operator):
 
     def execute(self, context):
         item = context.collection.hvym_meta_data.add()
+        markItemDirty(context.collection, len(context.collection.hvym_meta_data)-1)
         item.trait_type = 'anim'
         item.type = '*'
         item.values = 'Animation Property'
@@ -2769,7 +4796,7 @@ class HVYM_LIST_NewAnimItem(bpy.types.Operator):
         item.anim_blending = ad.action_blend_type
         item.model_ref = context.active_object
         UpdateAnimData(context)
-        updateNftData(context)
+        scheduleUpdate(context, 'nft')
 
         return{'FINISHED'}
 
@@ -2785,12 +4812,13 @@ class HVYM_LIST_NewMatItem(bpy.types.Operator):
 
     def execute(self, context):
         item = context.collection.hvym_meta_data.add()
+        markItemDirty(context.collection, len(context.collection.hvym_meta_data)-1)
         item.trait_type = 'mat_prop'
         item.type = '*'
         item.values = 'Material'
         item.mat_ref = context.active_object.active_material
 
-        updateNftData(context)
+        scheduleUpdate(context, 'nft')
 
         return{'FINISHED'}
 
@@ -2821,6 +4849,7 @@ class HVYM_LIST_NewMatSet(bpy.types.Operator):
             return
 
         item = context.collection.hvym_meta_data.add()
+        markItemDirty(context.collection, len(context.collection.hvym_meta_data)-1)
         item.trait_type = 'mat_set'
         item.type = '*'
         item.values = 'Material Set'
@@ -2831,8 +4860,7 @@ class HVYM_LIST_NewMatSet(bpy.types.Operator):
             mesh_set.model_ref = m.model_ref
             mesh_set.enabled = False
             
-        RebuildMaterialSets(context)
-        updateNftData(context)
+        scheduleUpdate(context, 'materials', 'nft')
 
         return{'FINISHED'}
 
@@ -2848,8 +4876,9 @@ class HVYM_LIST_NewMatSetItem(bpy.types.Operator):
             return
 
         mat_item = item.mat_set.add()
+        markItemDirty(context.collection, context.collection.hvym_list_index)
 
-        updateNftData(context)
+        scheduleUpdate(context, 'nft')
 
         return{'FINISHED'}
 
@@ -2865,10 +4894,11 @@ class HVYM_LIST_NewMatSetMaterial(bpy.types.Operator):
             return
 
         mat_item = item.mat_set.add()
+        markItemDirty(context.collection, context.collection.hvym_list_index)
         mat = bpy.data.materials.new(name='Material'+str(len(bpy.data.materials)-1))  # Create a material.
         mat_item.mat_ref = mat
 
-        updateNftData(context)
+        scheduleUpdate(context, 'nft')
 
         return{'FINISHED'}
 
@@ -2886,9 +4916,10 @@ class HVYM_LIST_DeleteMatSetItem(bpy.types.Operator):
         index = item.mat_set_index
 
         item.mat_set.remove(index)
+        markItemDirty(context.collection, context.collection.hvym_list_index)
         item.mat_set_index = min(max(0, index - 1), len(item.mat_set) - 1)
 
-        updateNftData(context)
+        scheduleUpdate(context, 'nft')
 
         return{'FINISHED'}
 
@@ -2912,9 +4943,10 @@ class HVYM_LIST_DeleteMatSetMaterial(bpy.types.Operator):
             bpy.ops.object.material_slot_remove()
 
         item.mat_set.remove(index)
+        markItemDirty(context.collection, context.collection.hvym_list_index)
         item.mat_set_index = min(max(0, index - 1), len(item.mat_set) - 1)
 
-        updateNftData(context)
+        scheduleUpdate(context, 'nft')
 
         return{'FINISHED'}
 
@@ -2939,6 +4971,7 @@ class HVYM_LIST_DeleteItem(bpy.types.Operator):
             bpy.data.meshes.remove(item.mat_lib_ref.data)
 
         hvym_meta_data.remove(index)
+        markCollectionDirty(context.collection)
         context.collection.hvym_list_index = min(max(0, index - 1), len(hvym_meta_data) - 1)
 
         return{'FINISHED'}
@@ -2970,6 +5003,8 @@ class HVYM_LIST_MoveItem(bpy.types.Operator):
 
         neighbor = index + (-1 if self.direction == 'UP' else 1)
         hvym_meta_data.move(neighbor, index)
+        markItemDirty(context.collection, neighbor)
+        markItemDirty(context.collection, index)
         self.move_index(self)
 
         return{'FINISHED'}
@@ -3021,6 +5056,7 @@ class HVYM_LIST_DefaultValues(bpy.types.Operator):
         index = context.collection.hvym_list_index
 
         item = hvym_meta_data[index]
+        markItemDirty(context.collection, context.collection.hvym_list_index)
 
         if item.trait_type == 'property':
             item.values = '(0,0,1)'
@@ -3045,7 +5081,10 @@ class HVYM_DataReload(bpy.types.Operator):
 
     def execute(self, context):
         print("Update NFT Data")
+        UPDATE_SCHEDULER.flush()
         RebuildMaterialSets(context)
+        NFT_CACHE.clear()
+        INTERACTABLES.clear()
         updateNftData(context)
         item = None
         if len(context.collection.hvym_meta_data)>0:
@@ -3076,145 +5115,907 @@ class HVYM_DataReload(bpy.types.Operator):
 
         return {'FINISHED'}
 
-class HVYM_UpdateMinter(bpy.types.Operator):
+# -------------------------------------------------------------------
+#   Export Cache
+# -------------------------------------------------------------------
+# Exported glb files are kept under a hash of the scene content that
+# ends up in them. Exporting an unchanged scene again links the cached
+# file into place instead of running the glTF exporter.
+GLB_CACHE_DIR = os.path.join(bpy.utils.user_resource('DATAFILES'), 'heavymeta_standard', 'glb_cache')
+GLB_CACHE_SIZE = 8
+RNA_VALUE_TYPES = ('BOOLEAN', 'INT', 'FLOAT', 'STRING', 'ENUM')
+# object types whose evaluated geometry is hashed, objects of types not
+# handled by hash_object are always exported
+GEOMETRY_OBJECT_TYPES = ('MESH', 'CURVE', 'SURFACE', 'FONT', 'META')
+
+def hash_elements(digest, elements, attr, width, typecode='f'):
+    """ Feed one attribute of a bpy collection into digest, read with
+    foreach_get.
+    """
+    count = len(elements) * width
+    if np != None:
+        values = np.empty(count, dtype=np.float32 if typecode == 'f' else np.int32)
+        elements.foreach_get(attr, values)
+        digest.update(values.tobytes())
+    else:
+        values = [0] * count
+        elements.foreach_get(attr, values)
+        digest.update(array.array(typecode, values).tobytes())
+
+def rna_values(struct):
+    values = []
+    for prop in struct.bl_rna.properties:
+        if prop.type not in RNA_VALUE_TYPES or prop.identifier == 'rna_type':
+            continue
+        value = getattr(struct, prop.identifier)
+        if getattr(prop, 'is_array', False):
+            value = tuple(value)
+        values.append((prop.identifier, value))
+
+    return values
+
+def hash_shape_keys(digest, data):
+    shape_keys = getattr(data, 'shape_keys', None)
+    if shape_keys == None:
+        return
+
+    for block in shape_keys.key_blocks:
+        digest.update(f'{block.name}:{block.value}:{block.slider_min}:{block.slider_max}'.encode())
+        hash_elements(digest, block.data, 'co', 3)
+
+def hash_geometry(digest, mesh):
+    """ Hash evaluated mesh data, with its uv maps and color attributes.
+    """
+    if mesh == None:
+        digest.update(b'no geometry')
+        return
+
+    hash_elements(digest, mesh.vertices, 'co', 3)
+    hash_elements(digest, mesh.loops, 'vertex_index', 1, 'i')
+    hash_elements(digest, mesh.polygons, 'loop_start', 1, 'i')
+    hash_elements(digest, mesh.polygons, 'material_index', 1, 'i')
+    for layer in mesh.uv_layers:
+        digest.update(layer.name.encode())
+        hash_elements(digest, layer.data, 'uv', 2)
+    for attribute in getattr(mesh, 'color_attributes', ()):
+        digest.update(f'{attribute.name}:{attribute.domain}:{attribute.data_type}'.encode())
+        hash_elements(digest, attribute.data, 'color', 4)
+
+def hash_armature(digest, obj):
+    for bone in obj.data.bones:
+        parent = bone.parent.name if bone.parent != None else ''
+        digest.update(f'{bone.name}:{parent}:{tuple(bone.head_local)}:{tuple(bone.tail_local)}'.encode())
+    for pose_bone in obj.pose.bones:
+        digest.update(f'{pose_bone.name}:{[v for row in pose_bone.matrix_basis for v in row]}'.encode())
+
+def hash_image(digest, image):
+    """ Hash the pixels source of an image, returns False when there is
+    nothing to fingerprint it by.
+    """
+    if image.is_dirty:
+        return False
+
+    if image.packed_file != None:
+        digest.update(f'{image.name}:packed:{image.packed_file.size}'.encode())
+        digest.update(image.packed_file.data)
+        return True
+
+    if image.source == 'GENERATED':
+        digest.update(f'{image.name}:{rna_values(image)}'.encode())
+        return True
+
+    image_path = bpy.path.abspath(image.filepath)
+    if not os.path.isfile(image_path):
+        return False
+
+    stat = os.stat(image_path)
+    digest.update(f'{image.name}:{image_path}:{stat.st_mtime}:{stat.st_size}'.encode())
+    return True
+
+def hash_material(digest, mat):
+    """ Returns False when the material uses data that can't be
+    fingerprinted.
+    """
+    digest.update(f'{mat.name}:{tuple(mat.diffuse_color)}'.encode())
+    if mat.node_tree == None:
+        return True
+
+    for node in mat.node_tree.nodes:
+        digest.update(f'{node.name}:{node.bl_idname}'.encode())
+        for socket in node.inputs:
+            value = getattr(socket, 'default_value', None)
+            if hasattr(value, '__len__') and not isinstance(value, str):
+                value = tuple(value)
+            digest.update(f'{socket.identifier}={value}'.encode())
+
+        image = getattr(node, 'image', None)
+        if image != None and not hash_image(digest, image):
+            return False
+
+    for link in mat.node_tree.links:
+        digest.update(f'{link.from_node.name}.{link.from_socket.identifier}>{link.to_node.name}.{link.to_socket.identifier}'.encode())
+
+    return True
+
+def hash_action(digest, action):
+    digest.update(action.name.encode())
+    for fcurve in action.fcurves:
+        digest.update(f'{fcurve.data_path}[{fcurve.array_index}]'.encode())
+        hash_elements(digest, fcurve.keyframe_points, 'co', 2)
+
+def hash_object(digest, obj, depsgraph):
+    """ Hash the exported data of obj, returns False for object types
+    that can't be fingerprinted.
+    """
+    if obj.type in GEOMETRY_OBJECT_TYPES:
+        hash_shape_keys(digest, obj.data)
+        #the evaluated mesh has modifiers, curve bevels and text applied
+        obj_eval = obj.evaluated_get(depsgraph)
+        try:
+            hash_geometry(digest, obj_eval.to_mesh())
+        finally:
+            obj_eval.to_mesh_clear()
+    elif obj.type == 'ARMATURE':
+        hash_armature(digest, obj)
+    elif obj.type in ('CAMERA', 'LIGHT'):
+        digest.update(str(rna_values(obj.data)).encode())
+    elif obj.type != 'EMPTY':
+        return False
+
+    return True
+
+def export_content_hash(objects, nft_data):
+    """ Hash of everything the glTF export of objects writes: the
+    objects with their transforms and evaluated geometry, armatures,
+    materials with their images, actions and the nftData payload added
+    by the export hook. None when something in it can't be
+    fingerprinted, the export has to run then.
+    """
+    digest = hashlib.sha256()
+    digest.update(hash_values(nft_data).encode())
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    materials = {}
+
+    for obj in sorted(objects, key=lambda o: o.name):
+        parent = obj.parent.name if obj.parent != None else ''
+        digest.update(f'{obj.name}:{obj.type}:{parent}:{obj.hide_render}'.encode())
+        digest.update(str([v for row in obj.matrix_world for v in row]).encode())
+        for mod in obj.modifiers:
+            digest.update(str(rna_values(mod)).encode())
+        for slot in obj.material_slots:
+            if slot.material != None:
+                materials[slot.material.name] = slot.material
+        if not hash_object(digest, obj, depsgraph):
+            return None
+
+    for name in sorted(materials.keys()):
+        if not hash_material(digest, materials[name]):
+            return None
+    for action in sorted(bpy.data.actions, key=lambda a: a.name):
+        hash_action(digest, action)
+
+    return digest.hexdigest()
+
+def glb_cache_path(content_hash):
+    return os.path.join(GLB_CACHE_DIR, content_hash+'.glb')
+
+def place_file(src, dst):
+    """ Hard-link src to dst, copying when the filesystem can't link.
+    """
+    if os.path.exists(dst):
+        os.unlink(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+def fetch_cached_glb(content_hash, glb_path):
+    cache_path = glb_cache_path(content_hash)
+    if not os.path.isfile(cache_path):
+        return False
+
+    place_file(cache_path, glb_path)
+    os.utime(cache_path)
+
+    return True
+
+def store_cached_glb(content_hash, glb_path):
+    try:
+        os.makedirs(GLB_CACHE_DIR, exist_ok=True)
+        tmp_path = glb_cache_path(content_hash)+'.tmp'
+        place_file(glb_path, tmp_path)
+        os.replace(tmp_path, glb_cache_path(content_hash))
+        prune_glb_cache()
+    except OSError as e:
+        print(f"Could not cache glb: {e}")
+
+def prune_glb_cache():
+    """ Keep only the GLB_CACHE_SIZE most recently used entries.
+    """
+    entries = [os.path.join(GLB_CACHE_DIR, f) for f in os.listdir(GLB_CACHE_DIR) if f.endswith('.glb')]
+    entries.sort(key=os.path.getmtime, reverse=True)
+    for file_path in entries[GLB_CACHE_SIZE:]:
+        os.unlink(file_path)
+
+# -------------------------------------------------------------------
+#   Collection Export
+# -------------------------------------------------------------------
+# In the per collection export mode each nft collection is written to
+# its own glb by a background Blender process, working on a snapshot
+# of the blend file.
+EXPORT_WORKER_SCRIPT = """
+import bpy, sys
+name, out_file = sys.argv[sys.argv.index('--') + 1:]
+
+def find_layer(layer):
+    if layer.collection.name == name:
+        return layer
+    for child in layer.children:
+        found = find_layer(child)
+        if found != None:
+            return found
+    return None
+
+bpy.context.view_layer.active_layer_collection = find_layer(bpy.context.view_layer.layer_collection)
+bpy.ops.export_scene.gltf(filepath=out_file, check_existing=False, export_format='GLB', use_active_collection=True)
+"""
+
+def export_worker_count(scene):
+    if scene.hvym_export_workers > 0:
+        return scene.hvym_export_workers
+
+    return max((os.cpu_count() or 2) // 2, 1)
+
+def export_worker_args(snapshot, collection_name, out_file):
+    return [bpy.app.binary_path, '--background', snapshot, '--python-exit-code', '1',
+            '--python-expr', EXPORT_WORKER_SCRIPT, '--', collection_name, out_file]
+
+def nft_collections(scene):
+    nft_data = scene.hvym_collections_data.nftData
+    return [col for col in bpy.data.collections if col.hvym_id != '' and col.hvym_id in nft_data.keys()]
+
+def find_layer_collection(layer, collection):
+    if layer.collection == collection:
+        return layer
+    for child in layer.children:
+        found = find_layer_collection(child, collection)
+        if found != None:
+            return found
+
+    return None
+
+def prepare_collection_exports(job):
+    """ Main thread part of the collection export, takes the cached glb
+    of unchanged collections and saves the snapshot the workers load.
+    Collections the workers can't make active, excluded from or not in
+    the view layer, are left out.
+    """
+    global SAVING_SNAPSHOT
+    out_dir = job.state['out_dir']
+    clear_glb_files(out_dir)
+    view_layer = bpy.context.view_layer
+    glb_files = []
+    pending = []
+
+    for col in nft_collections(bpy.context.scene):
+        layer = find_layer_collection(view_layer.layer_collection, col)
+        if layer == None or layer.exclude:
+            print(f"Not exporting collection {col.name}, it is excluded from or not linked to view layer {view_layer.name}.")
+            continue
+
+        out_file = os.path.join(out_dir, f"{job.state['file_name']}_{bpy.path.clean_name(col.name)}")
+        content_hash = export_content_hash(col.all_objects, job.state['nft_data'])
+        glb_files.append(out_file+'.glb')
+        if job.force or content_hash == None or not fetch_cached_glb(content_hash, out_file+'.glb'):
+            pending.append((col.name, out_file, content_hash))
+
+    if len(glb_files) == 0:
+        raise RuntimeError('No nft collections to export')
+
+    job.state['glb_files'] = glb_files
+    job.state['pending_exports'] = pending
+    job.state['snapshot'] = None
+    if len(pending) > 0:
+        job.state['snapshot'] = os.path.join(tempfile.gettempdir(), f'hvym_export_{SESSION_ID}.blend')
+        SAVING_SNAPSHOT = True
+        try:
+            bpy.ops.wm.save_as_mainfile(filepath=job.state['snapshot'], copy=True)
+        finally:
+            SAVING_SNAPSHOT = False
+
+def deploy_export_collections(job):
+    """ Export the pending collections in parallel. The first failure,
+    or cancelling the job, kills the exports still running and drops
+    the queued ones.
+    """
+    job.call_main(lambda: prepare_collection_exports(job))
+    snapshot = job.state['snapshot']
+    token = CancelToken()
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=job.state['export_workers'])
+    try:
+        futures = {}
+        for name, out_file, content_hash in job.state['pending_exports']:
+            future = pool.submit(job.run_process, export_worker_args(snapshot, name, out_file), None, token)
+            futures[future] = (out_file, content_hash)
+
+        done = 0
+        pending = set(futures.keys())
+        job.report(0.0, f'0/{len(futures)} collections')
+        while len(pending) > 0 and not job.cancelled.is_set():
+            finished, pending = concurrent.futures.wait(pending, timeout=0.5, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                out_file, content_hash = futures[future]
+                if future.result() != None and content_hash != None:
+                    store_cached_glb(content_hash, out_file+'.glb')
+                done += 1
+                job.report(done / len(futures), f'{done}/{len(futures)} collections')
+    finally:
+        token.cancel()
+        pool.shutdown(wait=True, cancel_futures=True)
+        if snapshot != None and os.path.isfile(snapshot):
+            os.unlink(snapshot)
+
+    if job.cancelled.is_set():
+        return
+
+    glb_files = job.state['glb_files']
+    job.state['glb_path'] = glb_files[0]
+    job.state['glb_hash'] = hash_values([hash_file(f) for f in glb_files])
+
+# -------------------------------------------------------------------
+#   Deploy Jobs
+# -------------------------------------------------------------------
+# Worker threads must not touch bpy, anything they need to write back
+# to the scene goes through call_on_main_thread.
+MAIN_THREAD_CALLS = queue.Queue()
+DEPLOY_JOB = None
+
+# Stage input hashes of the last successful deploys in this session.
+# Only stages that build local files, the glb export, are skipped when
+# their inputs match. EXPORT_REVISION counts data changes that can reach
+# the exported glb, together with SESSION_ID it stands in for hashing
+# the whole scene, so the records are kept in memory only, a record from
+# another session could never match.
+DEPLOY_STAGES = {}
+DEPLOY_STAGES_LOCK = threading.Lock()
+SESSION_ID = random_id(16)
+EXPORT_REVISION = 0
+EXPORT_TYPES = (bpy.types.Object, bpy.types.Mesh, bpy.types.Curve, bpy.types.MetaBall, bpy.types.Armature, bpy.types.Key, bpy.types.Camera, bpy.types.Light, bpy.types.Material, bpy.types.Image, bpy.types.Action, bpy.types.ShaderNodeTree, bpy.types.Collection)
+
+def call_on_main_thread(func):
+    MAIN_THREAD_CALLS.put(func)
+
+def run_main_thread_calls():
+    while not MAIN_THREAD_CALLS.empty():
+        func = MAIN_THREAD_CALLS.get()
+        try:
+            func()
+        except Exception as e:
+            print(f"Main thread call failed: {e}")
+
+    return 0.2
+
+def bumpExportRevision():
+    global EXPORT_REVISION
+    EXPORT_REVISION += 1
+
+def deploy_stage_record(key):
+    with DEPLOY_STAGES_LOCK:
+        return DEPLOY_STAGES.get(key)
+
+def save_deploy_stage(key, record):
+    with DEPLOY_STAGES_LOCK:
+        DEPLOY_STAGES[key] = record
+
+def hash_values(values):
+    return hashlib.sha256(json.dumps(values, sort_keys=True, default=str).encode()).hexdigest()
+
+def hash_file(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+class DeployStage:
+    """ One step of a DeployJob. A stage with an inputs function is
+    skipped when the hash of its inputs matches the last successful
+    run, its outputs are then restored into the job state from that run.
+    Outputs listed in files must also still exist on disk.
+    """
+
+    def __init__(self, label, func, main_thread=False, inputs=None, outputs=(), files=()):
+        self.label = label
+        self.func = func
+        self.main_thread = main_thread
+        self.inputs = inputs
+        self.outputs = outputs
+        self.files = files
+        self.input_hash = None
+
+
+class DeployJob:
+    """ A deploy, or other cli work, split into stages that run in order.
+    Cli stages run on a worker thread, stages that need bpy (the glTF
+    export) run on the main thread. step() is polled by the modal
+    operator, or by a timer for jobs started with run_job_in_background.
+    """
+
+    def __init__(self, name, force=False, **state):
+        self.name = name
+        self.force = force
+        self.stages = []
+        self.index = 0
+        self.state = state
+        self.thread = None
+        self.error = None
+        self.token = CancelToken()
+        self.cancelled = self.token.event
+
+    def add(self, label, func, main_thread=False, inputs=None, outputs=(), files=()):
+        self.stages.append(DeployStage(label, func, main_thread, inputs, outputs, files))
+
+    def done(self):
+        return self.index >= len(self.stages) or self.cancelled.is_set() or self.error != None
+
+    def progress(self):
+        return self.index / max(len(self.stages), 1)
+
+    def label(self):
+        if self.index < len(self.stages):
+            return self.stages[self.index].label
+
+        return ''
+
+    def report(self, fraction, message=None):
+        """ Post the progress of the running stage, fraction is the part
+        of the stage that is done.
+        """
+        label = self.label()
+        if message != None:
+            label = f'{label}: {message}'
+        PROGRESS.update(self.name, (self.index + fraction) / max(len(self.stages), 1), label)
+
+    def stage_key(self, stage):
+        return f'{bpy.data.filepath}:{self.name}:{stage.label}'
+
+    def skip_stage(self, stage):
+        """ Hash the stage inputs, and restore its outputs if they match
+        the last successful run. Called on the main thread.
+        """
+        stage.input_hash = None
+        if stage.inputs == None:
+            return False
+
+        stage.input_hash = hash_values(stage.inputs(self))
+        record = deploy_stage_record(self.stage_key(stage))
+        if self.force or record == None or record['hash'] != stage.input_hash:
+            return False
+
+        for key in stage.files:
+            value = record['outputs'].get(key, '')
+            for file_path in (value if isinstance(value, list) else [value]):
+                if not os.path.exists(file_path):
+                    return False
+
+        self.state.update(record['outputs'])
+        print(f"Skipping {stage.label}, inputs unchanged.")
+
+        return True
+
+    def run_stage(self, stage):
+        try:
+            stage.func(self)
+        except Exception as e:
+            self.error = f'{stage.label} failed: {e}'
+            print(self.error)
+            return
+
+        if stage.input_hash != None and not self.cancelled.is_set():
+            outputs = {key: self.state[key] for key in stage.outputs}
+            save_deploy_stage(self.stage_key(stage), {'hash': stage.input_hash, 'outputs': outputs})
+
+    def step(self):
+        """ Advance the job, returns True while there is work left.
+        """
+        if self.thread != None:
+            if self.thread.is_alive():
+                return True
+            self.thread = None
+            self.index += 1
+
+        if self.done():
+            PROGRESS.end(self.name)
+            return False
+
+        stage = self.stages[self.index]
+        self.report(0.0)
+        if self.skip_stage(stage):
+            self.index += 1
+        elif stage.main_thread:
+            self.run_stage(stage)
+            self.index += 1
+        else:
+            self.thread = threading.Thread(target=self.run_stage, args=(stage,), daemon=True)
+            self.thread.start()
+
+        return True
+
+    def run(self):
+        """ Run the whole job, blocking.
+        """
+        while self.step():
+            while self.thread != None and self.thread.is_alive():
+                run_main_thread_calls()
+                self.thread.join(0.05)
+
+        run_main_thread_calls()
+
+    def call_main(self, func):
+        """ Run func on the main thread from a worker stage, and wait
+        for its result.
+        """
+        done = threading.Event()
+        result = {}
+
+        def call():
+            try:
+                result['value'] = func()
+            except Exception as e:
+                result['error'] = e
+            finally:
+                done.set()
+
+        call_on_main_thread(call)
+        done.wait()
+        if 'error' in result:
+            raise result['error']
+
+        return result.get('value')
+
+    def run_process(self, args, timeout=None, token=None):
+        """ Run a command in its own process, so cancel() can stop it.
+        token also stops it, for calls that get dropped without
+        cancelling the job. Returns a CLIResult, stdout goes through a
+        temp file.
+        """
+        if token == None:
+            token = self.token
+        if self.cancelled.is_set() or token.cancelled():
+            return None
+
+        start = time()
+        result = run_output_to_file(args, envelope_env(), timeout=timeout, token=token)
+        profile_call('process', os.path.basename(args[0]), args, result, start)
+        if token.cancelled():
+            return None
+
+        return self.checked(result)
+
+    def run_cli(self, args):
+        self.report(0.0, args[0])
+        return self.checked(CLI_EXECUTOR.submit(args, token=self.token).result())
+
+    def checked(self, result):
+        if self.cancelled.is_set():
+            return None
+        if not result.ok:
+            raise RuntimeError(result.stderr or result.stdout or result.error)
+
+        return result
+
+    def cancel(self):
+        self.token.cancel()
+
+
+def deploy_confirm(job):
+    try:
+        setup = job.run_cli(['custom-choice-prompt', job.state['confirm_msg']])
+    except RuntimeError as e:
+        print(e)
+        setup = None
+    if setup == None or setup.stdout.rstrip() != 'OK':
+        job.cancel()
+
+def deploy_check_paths(job):
+    for p in job.state['required_paths']:
+        if not os.path.exists(p):
+            job.cancel()
+            return
+
+    loadingMessage(f"Building {job.state['project_type']} Client...")
+
+def deploy_minter_model_dir(job):
+    job.state['out_dir'] = call_cli_cached(['icp-minter-model-path']).rstrip()
+
+def clear_glb_files(out_dir):
+    for filename in os.listdir(out_dir):
+        file_path = os.path.join(out_dir, filename)
+        if os.path.isfile(file_path) and '.glb' in file_path:
+            os.unlink(file_path)
+
+def deploy_export(job):
+    out_dir = job.state['out_dir']
+    #Clear old glb file
+    clear_glb_files(out_dir)
+
+    out_file = os.path.join(out_dir, job.state['file_name'])
+    content_hash = export_content_hash(bpy.context.scene.objects, job.state['nft_data'])
+    if job.force or content_hash == None or not fetch_cached_glb(content_hash, out_file+'.glb'):
+        with PROFILER.span('addon', 'gltf_export', {'file': out_file+'.glb'}):
+            bpy.ops.export_scene.gltf(filepath=out_file,  check_existing=False, export_format='GLB')
+        if content_hash != None:
+            store_cached_glb(content_hash, out_file+'.glb')
+    else:
+        print(f"Using cached glb {content_hash}")
+
+    job.state['glb_path'] = out_file+'.glb'
+    job.state['glb_files'] = [job.state['glb_path']]
+    job.state['glb_hash'] = hash_file(job.state['glb_path'])
+
+def deploy_export_inputs(job):
+    UPDATE_SCHEDULER.flush()
+    nft_data = bpy.context.scene.hvym_collections_data.nftData
+    data = {}
+    for id in nft_data.keys():
+        value = nft_data[id]
+        data[id] = value.to_dict() if hasattr(value, 'to_dict') else value
+    job.state['nft_data'] = data
+
+    return [SESSION_ID, EXPORT_REVISION, data, job.state['out_dir'], job.state['file_name'], job.state['export_mode']]
+
+def deploy_update(job):
+    for glb_path in job.state['glb_files']:
+        job.run_cli([job.state['update_cmd'], os.path.basename(glb_path)] + job.state['update_args'])
+
+def deploy_assets(job):
+    project_type = job.state['project_type']
+    cmds = ['icp-deploy-assets', f'{project_type}']
+    if job.state['deployment'] == 'Deploy':
+        cmds = ['icp-deploy-assets', '--ic', f'{project_type}']
+
+    result = job.run_cli(cmds)
+    if result == None:
+        return
+
+    urls = result.payload
+    if not isinstance(urls, (list, tuple)) or len(urls) <= job.state['url_index']:
+        raise RuntimeError(f'Unexpected icp-deploy-assets output: {result.stdout}')
+
+    job.state['debug_url'] = urls[job.state['url_index']]
+
+def deploy_done(job):
+    url = job.state['debug_url']
+
+    def apply_result():
+        bpy.context.scene.hvym_debug_url = url
+        bpy.context.scene.hvym_deployment = 'Debug'
+
+    call_on_main_thread(apply_result)
+    job.run_cli(['custom-prompt', f"Project deployed locally@:\n{job.state['debug_url']}\n"])
+
+def build_deploy_job(context, confirm_msg, out_dir, update_cmd, update_args=(), url_index=2):
+    """ Collects everything the stages need from the scene up front,
+    the worker threads don't read bpy data.
+    """
+    scene = context.scene
+    if scene.hvym_nft_chain != 'ICP' or scene.hvym_project_path is None:
+        return None
+
+    project_path = scene.hvym_daemon_path.rstrip()
+    job = DeployJob(
+        scene.hvym_project_type,
+        force=scene.hvym_deploy_force,
+        confirm_msg=confirm_msg,
+        project_type=scene.hvym_project_type,
+        deployment=scene.hvym_deployment,
+        file_name=os.path.basename(bpy.data.filepath).replace('.blend', ''),
+        required_paths=[project_path] + list(update_args),
+        out_dir=out_dir,
+        export_mode=scene.hvym_export_mode,
+        export_workers=export_worker_count(scene),
+        update_cmd=update_cmd,
+        update_args=list(update_args),
+        url_index=url_index
+    )
+
+    job.add('Confirm', deploy_confirm)
+    job.add('Check paths', deploy_check_paths)
+    if out_dir == None:
+        job.add('Model path', deploy_minter_model_dir)
+    export_outputs = ('glb_path', 'glb_files', 'glb_hash')
+    if scene.hvym_export_mode == 'COLLECTIONS':
+        job.add('Export collections', deploy_export_collections, inputs=deploy_export_inputs, outputs=export_outputs, files=('glb_files',))
+    else:
+        job.add('Export glTF', deploy_export, main_thread=True, inputs=deploy_export_inputs, outputs=export_outputs, files=('glb_files',))
+    #updating and deploying change state outside the file, such as the
+    #canister or a restarted replica, so they always run
+    job.add('Update client', deploy_update)
+    job.add('Deploy assets', deploy_assets)
+    job.add('Done', deploy_done)
+
+    return job
+
+
+def run_job_in_background(job, on_done=None):
+    """ Drive job from a timer, for jobs that run without an operator.
+    """
+    def tick():
+        try:
+            if job.step():
+                return 0.1
+        except Exception as e:
+            job.cancel()
+            job.error = f'{job.name} failed: {e}'
+
+        run_main_thread_calls()
+        if job.error != None:
+            print(job.error)
+        if on_done != None:
+            on_done(job)
+
+        return None
+
+    bpy.app.timers.register(tick)
+
+
+class DeployJobOperator:
+    """ Mixin running the DeployJob from build_job as a modal operator,
+    ESC cancels it. execute runs the job blocking, for scripts.
+    """
+    _timer = None
+    _job = None
+
+    def build_job(self, context):
+        return None
+
+    def execute(self, context):
+        job = self.build_job(context)
+        if job != None:
+            job.run()
+
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        global DEPLOY_JOB
+        if DEPLOY_JOB != None:
+            self.report({'WARNING'}, "A deploy is already running.")
+            return {'CANCELLED'}
+
+        job = self.build_job(context)
+        if job == None:
+            return {'CANCELLED'}
+
+        DEPLOY_JOB = job
+        self._job = job
+        wm = context.window_manager
+        PROGRESS.begin(job.name, 'Starting')
+        self._timer = wm.event_timer_add(0.1, window=context.window)
+        wm.modal_handler_add(self)
+
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            self._job.cancel()
+            return {'RUNNING_MODAL'}
+
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        try:
+            if self._job.step():
+                return {'PASS_THROUGH'}
+        except Exception as e:
+            self._job.cancel()
+            self._job.error = f'{self._job.name} failed: {e}'
+
+        return self.finish(context)
+
+    def cancel(self, context):
+        """ Called by Blender when it drops the modal handler, on file
+        load or when modal raised.
+        """
+        if self._job != None:
+            self._job.cancel()
+        self.release(context)
+
+    def release(self, context):
+        """ Give up the timer, the progress entry and DEPLOY_JOB, once.
+        """
+        global DEPLOY_JOB
+        if self._timer != None:
+            context.window_manager.event_timer_remove(self._timer)
+            self._timer = None
+        if self._job != None and DEPLOY_JOB is self._job:
+            PROGRESS.end(self._job.name)
+            DEPLOY_JOB = None
+
+    def finish(self, context):
+        self.release(context)
+        run_main_thread_calls()
+
+        if self._job.error != None:
+            self.report({'ERROR'}, self._job.error)
+            return {'CANCELLED'}
+        if self._job.cancelled.is_set():
+            self.report({'INFO'}, "Deploy cancelled.")
+            return {'CANCELLED'}
+
+        return {'FINISHED'}
+
+
+class HVYM_UpdateMinter(DeployJobOperator, bpy.types.Operator):
     bl_idname = "hvym_update.minter"
     bl_label = "Update and Launch Minter UI"
     bl_description ="Launch minter UI debug."
     bl_options = {'REGISTER', 'UNDO'}
 
-    def execute(self, context):
+    def build_job(self, context):
         print("Update Minter")
-        file_path = bpy.data.filepath
-        file_name = os.path.basename(file_path).replace('.blend', '')
+        msg = f'{context.scene.hvym_deployment} {context.scene.hvym_nft_chain} Minter?'
 
-        if context.scene.hvym_nft_chain == 'ICP':
-            setup = choicePrompt(f'{context.scene.hvym_deployment} {context.scene.hvym_nft_chain} Minter?')
-            if setup.rstrip() == 'OK':
-                if context.scene.hvym_project_path is not None:
-                    project_path = bpy.context.scene.hvym_daemon_path.rstrip()
-                    #export gltf to project folder
-                    if os.path.exists(project_path):
-                        wm = bpy.context.window_manager
-                        wm.progress_begin(0, 88)
-                        wm.progress_update(88)
-                        loadingMessage(f'Building {context.scene.hvym_project_type} Client...')
-                        model_dir = call_cli(['icp-minter-model-path']).rstrip()
-                        out_file = os.path.join(model_dir, file_name)
-                        #Clear old file
-                        for filename in os.listdir(model_dir):
-                            file_path = os.path.join(model_dir, filename)
-                            if os.path.isfile(file_path) and '.glb' in file_path:
-                                os.unlink(file_path)
-
-                        bpy.ops.export_scene.gltf(filepath=out_file,  check_existing=False, export_format='GLB')
-                        run_command([CLI, 'icp-update-model-minter', file_name+'.glb'])
-                        project_type = context.scene.hvym_project_type
-                        cmds = [CLI, 'icp-deploy-assets', f'{project_type}']
-                        if context.scene.hvym_deployment == 'Deploy':
-                            cmds = [CLI, 'icp-deploy-assets', '--ic', f'{project_type}']
-                        urls = run_command(cmds)
-                        context.scene.hvym_debug_url = ast.literal_eval(urls)[3]
-                        wm.progress_end()
-                        prompt(f'Project deployed locally@:\n{context.scene.hvym_debug_url}\n', True)
-                        context.scene.hvym_deployment = 'Debug'
-
-        return {'FINISHED'}
+        return build_deploy_job(context, msg, None, 'icp-update-model-minter', url_index=3)
 
 
-class HVYM_UpdateModel(bpy.types.Operator):
+class HVYM_UpdateModel(DeployJobOperator, bpy.types.Operator):
     bl_idname = "hvym_update.model"
     bl_label = "Launch Model UI"
     bl_description ="Launch model UI debug."
     bl_options = {'REGISTER'}
 
-    def execute(self, context):
+    def build_job(self, context):
         print("Update Model")
-        file_path = bpy.data.filepath
-        file_name = os.path.basename(file_path).replace('.blend', '')
+        project_path = context.scene.hvym_daemon_path.rstrip()
+        src_dir = os.path.join(project_path, 'src', 'frontend', 'assets')
         msg = f'''
         {context.scene.hvym_deployment} your model for
         deployment on {context.scene.hvym_nft_chain}?
             '''
 
-        if context.scene.hvym_nft_chain == 'ICP':
-            setup = choicePrompt(msg)
-            if setup.rstrip() == 'OK':
-                if context.scene.hvym_project_path is not None:
-                    project_path = bpy.context.scene.hvym_daemon_path.rstrip()
-                    #export gltf to project folder
-                    if os.path.exists(project_path):
-                        wm = bpy.context.window_manager
-                        wm.progress_begin(0, 88)
-                        wm.progress_update(88)
-                        loadingMessage(f'Building {context.scene.hvym_project_type} Client...')
-                        src_dir = os.path.join(project_path, 'src', 'frontend', 'assets')
-                        out_file = os.path.join(src_dir, file_name)
-                        #Clear old file
-                        for filename in os.listdir(src_dir):
-                            file_path = os.path.join(src_dir, filename)
-                            if os.path.isfile(file_path) and '.glb' in file_path:
-                                os.unlink(file_path)
-
-                        bpy.ops.export_scene.gltf(filepath=out_file,  check_existing=False, export_format='GLB')
-                        run_command([CLI, 'icp-update-model', file_name+'.glb'])
-                        project_type = context.scene.hvym_project_type
-                        cmds = [CLI, 'icp-deploy-assets', f'{project_type}']
-                        if context.scene.hvym_deployment == 'Deploy':
-                            cmds = [CLI, 'icp-deploy-assets', '--ic', f'{project_type}']
-                        urls = run_command(cmds)
-                        wm.progress_end()
-                        context.scene.hvym_debug_url = ast.literal_eval(urls)[2]
-                        prompt(f'Project deployed locally@:\n{context.scene.hvym_debug_url}/n')
-                        context.scene.hvym_deployment = 'Debug'
-
-        return {'FINISHED'}
+        return build_deploy_job(context, msg, src_dir, 'icp-update-model')
 
 
-class HVYM_UpdateCustomClient(bpy.types.Operator):
+class HVYM_UpdateCustomClient(DeployJobOperator, bpy.types.Operator):
     bl_idname = "hvym_update.custom_client"
     bl_label = "Launch Custom Client UI"
     bl_description ="Update and launch custom client."
     bl_options = {'REGISTER'}
 
-    def execute(self, context):
+    def build_job(self, context):
         print("Update Custom Client")
-        file_path = bpy.data.filepath
-        file_name = os.path.basename(file_path).replace('.blend', '')
+        project_path = context.scene.hvym_daemon_path.rstrip()
+        backend_path = context.scene.hvym_custom_backend_path.rstrip()
+        src_dir = os.path.join(project_path, 'src', 'frontend', 'assets')
+        msg = f'{context.scene.hvym_deployment} {context.scene.hvym_nft_chain} Custom Client?'
 
-        if context.scene.hvym_nft_chain == 'ICP':
-            setup = choicePrompt(f'{context.scene.hvym_deployment} {context.scene.hvym_nft_chain} Custom Client?')
-            if setup.rstrip() == 'OK':
-                if context.scene.hvym_project_path is not None:
-                    project_path = bpy.context.scene.hvym_daemon_path.rstrip()
-                    backend_path = bpy.context.scene.hvym_custom_backend_path.rstrip()
-                    #export gltf to project folder
-                    if os.path.exists(project_path) and os.path.exists(backend_path):
-                        wm = bpy.context.window_manager
-                        wm.progress_begin(0, 88)
-                        wm.progress_update(88)
-                        loadingMessage(f'Building {context.scene.hvym_project_type} Client...')
-                        src_dir = os.path.join(project_path, 'src', 'frontend', 'assets')
-                        back_src_dir = os.path.join(project_path, 'src', 'backend')
-                        out_file = os.path.join(src_dir, file_name)
-                        #Clear old glb file
-                        for filename in os.listdir(src_dir):
-                            file_path = os.path.join(src_dir, filename)
-                            if os.path.isfile(file_path) and '.glb' in file_path:
-                                os.unlink(file_path)
-
-                        bpy.ops.export_scene.gltf(filepath=out_file,  check_existing=False, export_format='GLB')
-                        run_command([CLI, 'icp-update-custom-client', file_name+'.glb', f'{backend_path}'])
-                        project_type = context.scene.hvym_project_type
-                        cmds = [CLI, 'icp-deploy-assets', f'{project_type}']
-                        if context.scene.hvym_deployment == 'Deploy':
-                            cmds = [CLI, 'icp-deploy-assets', '--ic', f'{project_type}']
-                        urls = run_command(cmds)
-                        wm.progress_end()
-                        context.scene.hvym_debug_url = ast.literal_eval(urls)[2]
-                        prompt(f'Project deployed locally@:\n{context.scene.hvym_debug_url}\n')
-                        context.scene.hvym_deployment = 'Debug'
+        return build_deploy_job(context, msg, src_dir, 'icp-update-custom-client', update_args=(backend_path,))
 
-        return {'FINISHED'}
+
+DAEMON_PATH_CMDS = {
+    'model': 'icp-model-path',
+    'minter': 'icp-minter-path',
+    'custom': 'icp-custom-client-path',
+}
+
+def project_path_calls(scene):
+    calls = [['icp-project', scene.hvym_project_name], ['icp-project-path']]
+    daemon_path_cmd = DAEMON_PATH_CMDS.get(scene.hvym_project_type)
+    if daemon_path_cmd != None:
+        calls.append([daemon_path_cmd])
+
+    return calls
+
+def apply_project_paths(scene, results):
+    icp_path = results[1]
+    CLI_DISCOVERY.set_icp_path(icp_path)
+    scene.hvym_project_path = icp_path.rstrip()
+    if len(results) > 2:
+        scene.hvym_daemon_path = results[2]
+    else:
+        scene.hvym_daemon_path = os.path.join(icp_path, scene.hvym_project_type)
 
 
 class HVYM_SetProjectPaths(bpy.types.Operator):
@@ -3226,18 +6027,8 @@ class HVYM_SetProjectPaths(bpy.types.Operator):
     def execute(self, context):
         print("Set Project Paths")
         if context.scene.hvym_nft_chain == 'ICP':
-            call_cli(['icp-project', context.scene.hvym_project_name])
-            ICP_PATH = call_cli(['icp-project-path'])
-            context.scene.hvym_project_path = ICP_PATH.rstrip()
-            if context.scene.hvym_project_type == 'model':
-                context.scene.hvym_daemon_path = call_cli(['icp-model-path'])
-            elif context.scene.hvym_project_type == 'minter':
-                context.scene.hvym_daemon_path = call_cli(['icp-minter-path'])
-            elif context.scene.hvym_project_type == 'custom':
-                context.scene.hvym_daemon_path = call_cli(['icp-custom-client-path'])
-            else:
-                context.scene.hvym_daemon_path = os.path.join(ICP_PATH, context.scene.hvym_project_type)
-
+            results = call_cli_batch_cached(project_path_calls(context.scene))
+            apply_project_paths(context.scene, results)
 
         return {'FINISHED'}
 
@@ -3255,8 +6046,10 @@ class HVYM_SetProject(bpy.types.Operator):
             print(context.scene.hvym_project_name)
             if context.scene.hvym_nft_chain == 'ICP':
                 loadingMessage(f'Setting up {context.scene.hvym_project_type} project...')
+                CLI_CACHE.invalidate('icp-account-info', *PROJECT_PATH_COMMANDS)
                 bpy.ops.hvym_set.project_paths()
                 call_cli(['icp-init', context.scene.hvym_project_type, '-f'])
+                CLI_CACHE.invalidate()
 
             prompt(f'{context.scene.hvym_project_type} project has been created!')
 
@@ -3275,6 +6068,7 @@ class HVYM_SetAccount(bpy.types.Operator):
         if setup.rstrip() == 'OK':
             if context.scene.hvym_nft_chain == 'ICP':
                 run_command([CLI, 'icp-set-account', '-q'])
+                CLI_CACHE.invalidate()
                 UpdateAccountInfo(context)
 
         return {'FINISHED'}
@@ -3293,6 +6087,7 @@ class HVYM_NewAccount(bpy.types.Operator):
             print(context.scene.hvym_project_name)
             if context.scene.hvym_nft_chain == 'ICP':
                 run_command([CLI, 'icp-new-account'])
+                CLI_CACHE.invalidate()
                 UpdateAccountInfo(context)
 
         return {'FINISHED'}
@@ -3315,6 +6110,51 @@ class HVYM_SetLogoImage(bpy.types.Operator):
         return {'FINISHED'}
 
 
+DAEMON_START = None
+DAEMON_PROGRESS = 'DFX Daemon'
+
+def startDaemon(call_arr):
+    """ Start the test daemon on CLI_WINDOW_EXECUTOR, the toggle is reset if it
+    fails or times out.
+    """
+    global DAEMON_START
+    cancelDaemonStart()
+    token = CancelToken()
+    try:
+        future = CLI_WINDOW_EXECUTOR.submit(call_arr, token=token)
+    except RuntimeError as e:
+        print(e)
+        return None
+
+    DAEMON_START = (future, token)
+    PROGRESS.begin(DAEMON_PROGRESS, 'Starting')
+    on_future_done(future, daemonStarted)
+
+    return future
+
+def daemonStarted(future):
+    global DAEMON_START
+    if DAEMON_START == None or DAEMON_START[0] is not future:
+        return
+
+    DAEMON_START = None
+    PROGRESS.end(DAEMON_PROGRESS)
+    result = future.result()
+    if result.ok:
+        print(result.stdout)
+        print('------------------------------------')
+    else:
+        print("Command failed with error:", result.error)
+        bpy.context.scene.hvym_daemon_running = False
+
+def cancelDaemonStart():
+    global DAEMON_START
+    if DAEMON_START != None:
+        DAEMON_START[1].cancel()
+        DAEMON_START = None
+        PROGRESS.end(DAEMON_PROGRESS)
+
+
 class HVYM_ToggleAssetDaemon(bpy.types.Operator):
     bl_idname = "hvym_toggle_asset.daemon"
     bl_label = "Toggle the test daemon."
@@ -3322,22 +6162,17 @@ class HVYM_ToggleAssetDaemon(bpy.types.Operator):
     bl_options = {'REGISTER'}
 
     def execute(self, context):
-        wm = bpy.context.window_manager
         project_type = context.scene.hvym_project_type
         
         if context.scene.hvym_daemon_running == True:
             loadingMessage('Stopping DFX Daemon...')
+            cancelDaemonStart()
             call_cli(['icp-stop-assets', project_type])
             context.scene.hvym_debug_url = ''
         elif context.scene.hvym_daemon_running == False:
-            wm.progress_begin(0, 88)
-            wm.progress_update(88)
             loadingMessage('Starting DFX Daemon...')
-            output = run_futures_cmds([CLI+f' icp-start-assets {project_type}'])
-            wm.progress_update(88)
-            wm.progress_end()
-            print(output)
-            print('------------------------------------')
+            if startDaemon(['icp-start-assets', project_type]) == None:
+                return {'CANCELLED'}
 
         context.scene.hvym_daemon_running = not context.scene.hvym_daemon_running
 
@@ -3352,19 +6187,14 @@ class HVYM_ToggleMinterDaemon(bpy.types.Operator):
     bl_options = {'REGISTER'}
 
     def execute(self, context):
-        wm = bpy.context.window_manager
         
         if context.scene.hvym_daemon_running == True:
+            cancelDaemonStart()
             call_cli(['icp-stop-assets'])
             context.scene.hvym_debug_url = ''
         elif context.scene.hvym_daemon_running == False:
-            wm.progress_begin(0, 88)
-            wm.progress_update(88)
-            output = run_futures_cmds([CLI+' icp-start-assets'])
-            wm.progress_update(88)
-            wm.progress_end()
-            print(output)
-            print('------------------------------------')
+            if startDaemon(['icp-start-assets']) == None:
+                return {'CANCELLED'}
 
         context.scene.hvym_daemon_running = not context.scene.hvym_daemon_running
 
@@ -3609,11 +6439,38 @@ class HVYM_ExportHelper(bpy.types.Operator, ExportHelper):
     def execute(self, context):
         filepath = self.filepath
         bpy.context.scene.hvym_collections_data.enabled = True
-        bpy.ops.export_scene.gltf(filepath=filepath, check_existing=self.check_existing, export_format=self.export_format, export_copyright=self.export_copyright, export_texcoords=self.export_texcoords, export_normals=self.export_normals, export_tangents=self.export_tangents, export_colors=self.export_colors, use_mesh_edges=self.use_mesh_edges, use_mesh_vertices=self.use_mesh_vertices, export_cameras=self.export_cameras, use_selection=self.use_selection, use_visible=self.use_visible, use_renderable=self.use_renderable, use_active_collection=self.use_active_collection, use_active_scene=self.use_active_scene, export_yup=self.export_yup, export_frame_range=self.export_frame_range, export_frame_step=self.export_frame_step, export_force_sampling=self.export_force_sampling, export_nla_strips=self.export_nla_strips, export_def_bones=self.export_def_bones, export_all_influences=self.export_all_influences, export_morph_normal=self.export_morph_normal, export_morph_tangent=self.export_morph_tangent, export_lights=self.export_lights)
+        with PROFILER.span('addon', 'gltf_export', {'file': filepath}):
+            bpy.ops.export_scene.gltf(filepath=filepath, check_existing=self.check_existing, export_format=self.export_format, export_copyright=self.export_copyright, export_texcoords=self.export_texcoords, export_normals=self.export_normals, export_tangents=self.export_tangents, export_colors=self.export_colors, use_mesh_edges=self.use_mesh_edges, use_mesh_vertices=self.use_mesh_vertices, export_cameras=self.export_cameras, use_selection=self.use_selection, use_visible=self.use_visible, use_renderable=self.use_renderable, use_active_collection=self.use_active_collection, use_active_scene=self.use_active_scene, export_yup=self.export_yup, export_frame_range=self.export_frame_range, export_frame_step=self.export_frame_step, export_force_sampling=self.export_force_sampling, export_nla_strips=self.export_nla_strips, export_def_bones=self.export_def_bones, export_all_influences=self.export_all_influences, export_morph_normal=self.export_morph_normal, export_morph_tangent=self.export_morph_tangent, export_lights=self.export_lights)
         print("Exported glTF to: ", filepath)
         return {'FINISHED'}
 
 
+class HVYM_ExportTrace(bpy.types.Operator, ExportHelper):
+    bl_idname = "hvym_export.trace"
+    bl_label = "Export Trace"
+    bl_description ="Export the recorded cli calls and timings as a Chrome trace."
+    filename_ext = ".json"
+
+    filter_glob: bpy.props.StringProperty(default="*.json", options={'HIDDEN'})
+
+    def execute(self, context):
+        with open(self.filepath, 'w', encoding='utf-8') as f:
+            json.dump(PROFILER.trace(), f)
+        self.report({'INFO'}, f"Trace written to {self.filepath}")
+        return {'FINISHED'}
+
+
+class HVYM_ResetProfile(bpy.types.Operator):
+    bl_idname = "hvym_reset.profile"
+    bl_label = "Reset Timings"
+    bl_description ="Clear the recorded cli calls and timings."
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        PROFILER.reset()
+        return {'FINISHED'}
+
+
 class HVYM_DeployMinter(bpy.types.Operator):
     bl_idname = "hvym_deploy.minter"
     bl_label = "Launch Deploy Minter UI"
@@ -3661,12 +6518,13 @@ class HVYM_DeployProject(bpy.types.Operator):
         if context.scene.hvym_daemon_running and len(canister_id)>0:
             context.scene.hvym_deployment = 'Deploy'
             run_command([CLI, 'icp-assign-canister-id', project_type, canister_id])
+            CLI_CACHE.invalidate()
             if context.scene.hvym_project_type == 'model':
-                bpy.ops.hvym_update.model()
+                bpy.ops.hvym_update.model('INVOKE_DEFAULT')
             elif context.scene.hvym_project_type == 'minter':
-                bpy.ops.hvym_update.minter()
+                bpy.ops.hvym_update.minter('INVOKE_DEFAULT')
             elif context.scene.hvym_project_type == 'custom':
-                bpy.ops.hvym_update.custom_client()
+                bpy.ops.hvym_update.custom_client('INVOKE_DEFAULT')
         else:
             prompt('Daemon must be running in order to deploy.')
         return {'FINISHED'}
@@ -4092,6 +6950,10 @@ class HVYM_ScenePanel(bpy.types.Panel):
         row.prop(context.scene, 'hvym_enable_context_menu')
         row = box.row()
         row.prop(context.scene, 'hvym_menu_indicator_shown')
+        row = box.row()
+        row.prop(context.scene, 'hvym_update_delay')
+        row = box.row()
+        row.prop(context.scene, 'hvym_account_cache_ttl')
         if context.scene.hvym_project_type=='custom':
             row = box.row()
             row.prop(context.scene, 'hvym_custom_backend_path')
@@ -4142,6 +7004,13 @@ class HVYM_ScenePanel(bpy.types.Panel):
             row.separator()
             row.label(text="Deploy:")
             row = box.row()
+            row.prop(context.scene, 'hvym_export_mode')
+            if context.scene.hvym_export_mode == 'COLLECTIONS':
+                row = box.row()
+                row.prop(context.scene, 'hvym_export_workers')
+            row = box.row()
+            row.prop(context.scene, 'hvym_deploy_force')
+            row = box.row()
             row.operator('hvym_deploy.project', text="Deploy", icon="URL")
         # row = box.row()
         # row.operator('hvym_export.project', text="Export Project", icon="EXPORT")
@@ -4149,6 +7018,37 @@ class HVYM_ScenePanel(bpy.types.Panel):
             # row.operator('hvym_deploy.confirm_nft_deploy_dialog', text="Deploy NFT", icon="URL")
         
 
+class HVYM_ProfilePanel(bpy.types.Panel):
+    """Timings of cli calls and addon functions"""
+    bl_label = "Performance"
+    bl_idname = "SCENE_PT_heavymeta_standard_profile"
+    bl_space_type = 'PROPERTIES'
+    bl_region_type = 'WINDOW'
+    bl_context = "scene"
+    bl_parent_id = "SCENE_PT_heavymeta_standard_data"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        col = self.layout.column()
+        row = col.row()
+        row.operator('hvym_export.trace', text="Export Trace", icon="EXPORT")
+        row.operator('hvym_reset.profile', text="Reset", icon="TRASH")
+        rows = PROFILER.summary()
+        if len(rows) == 0:
+            col.label(text="Nothing recorded yet.")
+            return
+
+        box = col.box()
+        grid = box.grid_flow(row_major=True, columns=6, even_columns=False, align=True)
+        for text in ('Name', 'Calls', 'Mean', 'p50', 'p95', 'Max'):
+            grid.label(text=text)
+        for category, name, stats in rows:
+            grid.label(text=name, icon='CONSOLE' if category == 'cli' else 'TIME')
+            grid.label(text=f"{stats.count}" if stats.errors == 0 else f"{stats.count} ({stats.errors} failed)")
+            for seconds in (stats.mean(), stats.percentile(0.5), stats.percentile(0.95), stats.max):
+                grid.label(text=f"{seconds * 1000:.1f} ms")
+
+
 class HVYM_MeshPanel(bpy.types.Panel):
     """Creates a Panel in the Object properties window"""
     bl_label = "Heavymeta Standard Data"
@@ -4448,6 +7348,7 @@ class HVYM_AddMorph(bpy.types.Operator):
             item = context.collection.hvym_meta_data[context.collection.hvym_list_index]
             if item.trait_type == 'morph_set':
                 morph = item.morph_set.add()
+                markItemDirty(context.collection, context.collection.hvym_list_index)
                 morph.name = btn.active_shape_key.name
                 morph.float_default = btn.active_shape_key.value
                 morph.float_min = btn.active_shape_key.slider_min
@@ -4478,6 +7379,7 @@ class HVYM_AddModel(bpy.types.Operator):
             print('add model to data')
             if has_hvym_data('model', obj.name) == False:
                 item = context.collection.hvym_meta_data.add()
+                markItemDirty(context.collection, len(context.collection.hvym_meta_data)-1)
                 item.trait_type = 'mesh'
                 item.type = obj.name
                 item.values = 'Object'
@@ -4505,6 +7407,7 @@ class HVYM_AddAnim(bpy.types.Operator):
 
         if ob != None and active_action != None and has_hvym_data('anim', active_action.name) == False:
             item = context.collection.hvym_meta_data.add()
+            markItemDirty(context.collection, len(context.collection.hvym_meta_data)-1)
             item.trait_type = 'anim'
             item.values = 'Animation Property'
             item.type = active_action.name
@@ -4513,7 +7416,7 @@ class HVYM_AddAnim(bpy.types.Operator):
             item.anim_blending = ad.action_blend_type
             item.model_ref = ob
             UpdateAnimData(context)
-            updateNftData(context)
+            scheduleUpdate(context, 'nft')
 
         else:
             print("Item already exists in data.")
@@ -4537,6 +7440,7 @@ class HVYM_AddMaterial(bpy.types.Operator):
         if matName != None:
             if has_hvym_data('mat_prop', matName) == False:
                 item = context.collection.hvym_meta_data.add()
+                markItemDirty(context.collection, len(context.collection.hvym_meta_data)-1)
                 item.trait_type = 'mat_prop'
                 item.type = matName
                 item.values = 'Material'
@@ -4570,9 +7474,10 @@ class HVYM_AddMaterialToSet(bpy.types.Operator):
                 item = context.collection.hvym_meta_data[context.collection.hvym_list_index]
                 if item.trait_type == 'mat_set':
                     mat_item = item.mat_set.add()
+                    markItemDirty(context.collection, context.collection.hvym_list_index)
                     item.values = 'Material Set'
                     mat_item.mat_ref = bpy.data.materials[matName]
-                    RebuildMaterialSets(context)
+                    scheduleUpdate(context, 'materials')
                     
             else:
                 print("Item already exists in data.")
@@ -4600,9 +7505,10 @@ class HVYM_AddAllMeshMaterialsToSet(bpy.types.Operator):
                     item = context.collection.hvym_meta_data[context.collection.hvym_list_index]
                     if item.trait_type == 'mat_set':
                         mat_item = item.mat_set.add()
+                        markItemDirty(context.collection, context.collection.hvym_list_index)
                         item.values = 'Material Set'
                         mat_item.mat_ref = slot.material
-                    RebuildMaterialSets(context)
+                    scheduleUpdate(context, 'materials')
                     
             else:
                 print("Item already exists in data.")
@@ -4621,6 +7527,7 @@ class HVYM_UpdateHandler(bpy.types.Operator):
         return True
 
     def execute(self, context):
+        UPDATE_SCHEDULER.flush()
         updateNftData(context)
     
 
@@ -4694,6 +7601,8 @@ blender_classes = [
     HVYM_ExportProject,
     HVYM_DataReload,
     HVYM_ExportHelper,
+    HVYM_ExportTrace,
+    HVYM_ResetProfile,
     HVYM_DeployMinter,
     HVYM_DeployConfirmMinterDeployDialog,
     HVYM_DeployProject,
@@ -4702,6 +7611,7 @@ blender_classes = [
     HVYM_NLA_DataPanel,
     HVYM_DataPanel,
     HVYM_ScenePanel,
+    HVYM_ProfilePanel,
     HVYM_MeshPanel,
     HVYM_NFTDataExtensionProps,
     HVYMGLTF_PT_export_user_extensions,
@@ -4716,20 +7626,177 @@ blender_classes = [
     HVYM_UpdateHandler
     ]
 
+# -------------------------------------------------------------------
+#   Project Restore
+# -------------------------------------------------------------------
+# Opening a file restores its cli project, paths and account in the
+# background, the scene properties are filled in when the job is done.
+RESTORE_JOB = None
+
+def restore_find_cli(job):
+    if not cliInstalled():
+        job.cancel()
+        return
+
+    call_cli_threaded(['splash'])
+    print(f"Heavymeta CLI current project is: {icpPath()}!!, being changed to: {job.state['project_name']}")
+
+def restore_project_paths(job):
+    job.state['path_results'] = call_cli_batch_cached(job.state['path_calls'])
+
+def restore_account_info(job):
+    job.state['account'] = call_cli_json(['icp-account-info'])
+
+def restore_apply(job):
+    #A different file was opened meanwhile
+    if bpy.data.filepath != job.state['file_path']:
+        job.cancel()
+        return
+
+    scene = bpy.context.scene
+    if job.state['path_results'] != None:
+        apply_project_paths(scene, job.state['path_results'])
+    scene.hvym_account_name = job.state['account']['active_id']
+    scene.hvym_address = job.state['account']['principal']
+
+def restore_done(job):
+    job.run_cli(['custom-prompt', f"Active Account set to: {job.state['account']['active_id']}"])
+
+def build_restore_job(scene):
+    job = DeployJob(
+        'Restore project',
+        project_name=scene.hvym_project_name,
+        file_path=bpy.data.filepath,
+        path_calls=project_path_calls(scene),
+        path_results=None
+    )
+
+    job.add('Find cli', restore_find_cli)
+    if scene.hvym_nft_chain == 'ICP':
+        job.add('Project paths', restore_project_paths)
+    job.add('Account info', restore_account_info)
+    job.add('Apply', restore_apply, main_thread=True)
+    job.add('Done', restore_done)
+
+    return job
+
+def restoreProject(scene):
+    global RESTORE_JOB
+    if RESTORE_JOB != None:
+        RESTORE_JOB.cancel()
+
+    RESTORE_JOB = build_restore_job(scene)
+    run_job_in_background(RESTORE_JOB)
+
+# -------------------------------------------------------------------
+#   Save Refresh
+# -------------------------------------------------------------------
+# Saving no longer rebuilds the nftData on the save path. The parts
+# that are out of date are listed in the saved file, so after loading
+# it NFT_CACHE knows what still needs a refresh, and the refresh runs
+# in the background after the save.
+STALE_NFT_KEY = 'staleNftData'
+NFT_REFRESH_JOB = None
+NFT_REFRESH_AGAIN = False
+# set while the collection export saves its snapshot copy, which fires
+# the save handlers too
+SAVING_SNAPSHOT = False
+
+def refresh_collect(job):
+    scene = bpy.context.scene
+    nft_data = scene.hvym_collections_data.nftData
+    checkObjectRefs()
+    collections = []
+    for col in bpy.data.collections:
+        if col.hvym_id in NFT_CACHE.collections or (col.hvym_id in nft_data and NFT_CACHE.is_dirty(col.hvym_id)):
+            collections.append(col)
+
+    contract_params, jobs = collect_nft_jobs(scene, collections)
+    if contract_params == None and len(jobs) == 0:
+        job.cancel()
+        return
+
+    job.state['file_path'] = bpy.data.filepath
+    job.state['contract_params'] = contract_params
+    job.state['jobs'] = jobs
+    job.state['generation'] = NFT_CACHE.generation
+
+def refresh_parse(job):
+    contract_params = job.state['contract_params']
+    jobs = job.state['jobs']
+    generation = job.state['generation']
+    try:
+        job.state['results'] = run_nft_jobs(contract_params, jobs)
+    except Exception:
+        call_on_main_thread(lambda: requeue_nft_jobs(contract_params, jobs, generation))
+        raise
+
+def refresh_apply(job):
+    if bpy.data.filepath != job.state['file_path']:
+        job.cancel()
+        return
+
+    apply_nft_results(bpy.context.scene, job.state['results'], job.state['generation'])
+
+def refresh_finished(job):
+    global NFT_REFRESH_JOB, NFT_REFRESH_AGAIN
+    NFT_REFRESH_JOB = None
+    if NFT_REFRESH_AGAIN:
+        NFT_REFRESH_AGAIN = False
+        refreshNftData()
+
+def refreshNftData():
+    """ Refresh the dirty parts of the nftData in the background. Runs
+    one refresh at a time, a request made while one runs is queued.
+    """
+    global NFT_REFRESH_JOB, NFT_REFRESH_AGAIN
+    if NFT_REFRESH_JOB != None:
+        NFT_REFRESH_AGAIN = True
+        return
+
+    NFT_REFRESH_JOB = DeployJob('Refresh nft data')
+    NFT_REFRESH_JOB.add('Collect', refresh_collect, main_thread=True)
+    NFT_REFRESH_JOB.add('Parse', refresh_parse)
+    NFT_REFRESH_JOB.add('Apply', refresh_apply, main_thread=True)
+    run_job_in_background(NFT_REFRESH_JOB, refresh_finished)
+
+@persistent
+def pre_file_save(file_path):
+    if SAVING_SNAPSHOT:
+        return
+
+    data = bpy.context.scene.hvym_collections_data
+    data[STALE_NFT_KEY] = NFT_CACHE.stale_keys(data.nftData.keys())
+
 @persistent
 def post_file_load(file_path):
+    global NFT_REFRESH_JOB, NFT_REFRESH_AGAIN
+    if NFT_REFRESH_JOB != None:
+        #loading drops the timer driving it, refresh_finished won't run
+        NFT_REFRESH_JOB.cancel()
+        NFT_REFRESH_JOB = None
+        NFT_REFRESH_AGAIN = False
+
+    NFT_CACHE.clear()
+    data = bpy.context.scene.hvym_collections_data
+    NFT_CACHE.mark_loaded(data.nftData.keys(), data.get(STALE_NFT_KEY, []))
+    checkObjectRefs()
+    INTERACTABLES.clear()
+    MAT_REF_CACHE.clear()
+    MENU_INDEX.clear()
+    bumpExportRevision()
+    CLI_CACHE_TTL['icp-account-info'] = bpy.context.scene.hvym_account_cache_ttl
     if bpy.context.scene.hvym_project_name == 'NOT-SET!!!!':
         return
 
-    if CLI_INSTALLED and ( bpy.context.scene.hvym_project_path != "NOT-SET!!!!" or bpy.context.scene.hvym_project_path != ICP_PATH):
-        call_cli_threaded(['splash'])
-        print(f"Heavymeta CLI current project is: {ICP_PATH}!!, being changed to: {bpy.context.scene.hvym_project_name}")
-        bpy.ops.hvym_set.project_paths()
-        UpdateAccountInfo(bpy.context)
+    restoreProject(bpy.context.scene)
 
 @persistent
 def post_file_save(file_path):
-    bpy.ops.hvym_meta_data.update()
+    if SAVING_SNAPSHOT:
+        return
+
+    refreshNftData()
 
 
 def register():
@@ -4767,6 +7834,11 @@ def register():
     bpy.types.Scene.hvym_action_meta_data = bpy.props.CollectionProperty(type = HVYM_ActionDataItem)
     bpy.types.Scene.hvym_action_list_index = bpy.props.IntProperty(name = "Index for active hvym_action_meta_data", default = 0)
     bpy.types.Scene.hvym_project_set = bpy.props.BoolProperty(name = "Flag for initializing project on file load", default = False)
+    bpy.types.Scene.hvym_deploy_force = bpy.props.BoolProperty(name = "Force Full Deploy", description = "Run every deploy stage, even the ones whose inputs didn't change.", default = False)
+    bpy.types.Scene.hvym_export_mode = bpy.props.EnumProperty(name = "Export Mode", description = "Export the scene as one glb, or every nft collection to its own glb.", items = (('SCENE', 'Scene', 'Export the whole scene to one glb.'), ('COLLECTIONS', 'Per Collection', 'Export each nft collection to its own glb, in background Blender processes.')), default = 'SCENE')
+    bpy.types.Scene.hvym_export_workers = bpy.props.IntProperty(name = "Export Workers", description = "Background Blender processes used by the per collection export, 0 uses half of the cores.", default = 0, min = 0, max = 64)
+    bpy.types.Scene.hvym_update_delay = bpy.props.FloatProperty(name = "Update Delay", description = "Seconds without edits before queued data updates run.", default = 0.25, min = 0.0, max = 5.0)
+    bpy.types.Scene.hvym_account_cache_ttl = bpy.props.FloatProperty(name = "Account Cache Time", description = "Seconds the active account looked up from the cli is reused for, 0 looks it up every time.", default = CLI_ACCOUNT_CACHE_TTL, min = 0.0, max = 300.0, update = onUpdateAccountCacheTtl)
     bpy.types.Collection.hvym_meta_data = bpy.props.CollectionProperty(type = HVYM_DataItem)
     bpy.types.Collection.hvym_menu_index = bpy.props.IntProperty(name = "Index for active hvym_meta_data menus", default = -1)
     bpy.types.Object.hvym_menu_index = bpy.props.IntProperty(name = "Index for active hvym_meta_data menus", default = -1)
@@ -4787,11 +7859,40 @@ def register():
         bpy.types.Object.hvym_id = bpy.props.StringProperty(default = '')
 
     bpy.app.handlers.load_post.append(post_file_load)
+    bpy.app.handlers.save_pre.append(pre_file_save)
     bpy.app.handlers.save_post.append(post_file_save)
+    bpy.app.handlers.undo_post.append(post_undo)
+    bpy.app.handlers.redo_post.append(post_undo)
+    bpy.app.handlers.depsgraph_update_post.append(post_depsgraph_update)
+    bpy.app.timers.register(run_main_thread_calls, persistent=True)
+    bpy.app.timers.register(PROGRESS.timer, persistent=True)
 
 
 def unregister():
     bpy.types.Scene.hvym_project_set = False
+    CLI_WORKER.stop()
+    cancelDaemonStart()
+    CLI_EXECUTOR.shutdown()
+    CLI_WINDOW_EXECUTOR.shutdown()
+    UPDATE_SCHEDULER.cancel()
+    SERIALIZERS.clear()
+    bpy.app.handlers.load_post.remove(post_file_load)
+    bpy.app.handlers.save_pre.remove(pre_file_save)
+    bpy.app.handlers.save_post.remove(post_file_save)
+    bpy.app.handlers.undo_post.remove(post_undo)
+    bpy.app.handlers.redo_post.remove(post_undo)
+    bpy.app.handlers.depsgraph_update_post.remove(post_depsgraph_update)
+    if bpy.app.timers.is_registered(run_main_thread_calls):
+        bpy.app.timers.unregister(run_main_thread_calls)
+    if bpy.app.timers.is_registered(PROGRESS.timer):
+        bpy.app.timers.unregister(PROGRESS.timer)
+    PROGRESS.clear()
+    if DEPLOY_JOB != None:
+        DEPLOY_JOB.cancel()
+    if RESTORE_JOB != None:
+        RESTORE_JOB.cancel()
+    if NFT_REFRESH_JOB != None:
+        NFT_REFRESH_JOB.cancel()
     for pcoll in preview_collections.values():
         bpy.utils.previews.remove(pcoll)
     preview_collections.clear()
@@ -4801,6 +7902,11 @@ def unregister():
     del bpy.types.Scene.hvym_action_meta_data
     del bpy.types.Scene.hvym_action_list_index
     del bpy.types.Scene.hvym_project_set
+    del bpy.types.Scene.hvym_update_delay
+    del bpy.types.Scene.hvym_account_cache_ttl
+    del bpy.types.Scene.hvym_deploy_force
+    del bpy.types.Scene.hvym_export_mode
+    del bpy.types.Scene.hvym_export_workers
     del bpy.types.Collection.hvym_meta_data
     del bpy.types.Collection.hvym_menu_index
     del bpy.types.Object.hvym_menu_index
@@ -4861,6 +7967,7 @@ class glTF2ExportUserExtension:
         ctx = bpy.context.scene
 
         if ctx.hvym_collections_data.enabled:
+            UPDATE_SCHEDULER.flush()
             data = {}
 
             for id in ctx.hvym_collections_data.nftData.keys():
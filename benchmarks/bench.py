@@ -0,0 +1,251 @@
+"""
+Headless benchmarks of the serializer and nft data update path, run on
+the bpy stand-in in fake_bpy.py:
+
+    python benchmarks/bench.py --output bench.json
+    python benchmarks/bench.py --items 100 --compare bench.json
+
+The synthetic collection holds --items items of every trait type,
+--mesh-set entries in each mesh set and --materials materials. Every
+benchmark runs once to warm up, then --repeat times. The results file
+holds the min, median and mean seconds per call of each benchmark, and
+the sizes and python version they were taken with. --compare lists the
+benchmarks whose median got slower than --threshold times the one in an
+earlier results file, and exits with 1 if there are any.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+from time import perf_counter, time
+
+import fake_bpy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_VERSION = 1
+TRAIT_TYPES = ('property', 'text', 'call', 'mesh', 'mesh_set', 'morph_set', 'anim', 'mat_prop', 'mat_set')
+PRINCIPLED_INPUTS = {
+    'Roughness': 0.5,
+    'Metallic': 0.0,
+    'Specular Tint': (1.0, 1.0, 1.0, 1.0),
+    'Specular IOR Level': 0.5,
+    'Anisotropic': 0.0,
+    'Anisotropic Rotation': 0.0,
+    'Coat Weight': 0.0,
+    'Emission Color': (0.0, 0.0, 0.0, 1.0),
+    'Emission Strength': 0.0,
+    'Sheen Tint': (1.0, 1.0, 1.0, 1.0),
+    'Sheen Weight': 0.0,
+}
+ENUM_ITEMS = tuple((f'ENUM{i}', f'Enum {i}', '') for i in range(8))
+
+
+def load_addon():
+    """ Import the addon from the repository root on the fake bpy, and
+    register it with its own timings switched off. The nft data
+    benchmarks time the in-process parsers, there is no cli here.
+    """
+    bpy = fake_bpy.install()
+    spec = importlib.util.spec_from_file_location('heavymeta_standard', os.path.join(ROOT, '__init__.py'), submodule_search_locations=[ROOT])
+    addon = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = addon
+    spec.loader.exec_module(addon)
+    addon.register()
+    addon.PROFILER.enabled = False
+    addon.PARSER_MODE = 'python'
+
+    return bpy, addon
+
+
+def make_material(bpy, name, i):
+    T = bpy.types
+    inputs = dict(PRINCIPLED_INPUTS, Metallic=(i % 10) / 10)
+    nodes = [T.Node('BSDF_PRINCIPLED', inputs), T.Node('OUTPUT_MATERIAL', {})]
+    links = [T.NodeLink(nodes[0], nodes[0].inputs['Roughness'], nodes[1], None)]
+    return T.Material(name, diffuse_color=(i / 100 % 1, 0.5, 0.25, 1.0), node_tree=T.NodeTree(nodes, links))
+
+
+def build_scene(bpy, items, mesh_set, materials):
+    """ A scene with one nft collection holding items of every trait
+    type, returns bpy.context.
+    """
+    T = bpy.types
+    scene = T.Scene('Scene')
+    col = T.Collection('Collection')
+    col.hvym_id = 'bench000'
+    bpy.data.collections.append(col)
+    bpy.context.scene = scene
+    bpy.context.collection = col
+
+    mats = [make_material(bpy, f'Material{i}', i) for i in range(materials)]
+    bpy.data.materials.extend(mats)
+
+    objs = []
+    for i in range(max(mesh_set, items, 1)):
+        obj = T.Object(f'Object{i}', T.Mesh(f'Mesh{i}'))
+        objs.append(obj)
+        scene.objects.append(obj)
+        col.objects.append(obj)
+        bpy.data.objects.append(obj)
+
+    for trait_type in TRAIT_TYPES:
+        for j in range(items):
+            item = col.hvym_meta_data.add()
+            item.trait_type = trait_type
+            item.type = f'{trait_type}{j}'
+            if trait_type in ('mesh', 'morph_set', 'anim'):
+                item.model_ref = objs[j % len(objs)]
+            elif trait_type == 'mesh_set':
+                for k in range(mesh_set):
+                    item.mesh_set.add().model_ref = objs[k % len(objs)]
+            elif trait_type == 'mat_prop' and len(mats) > 0:
+                item.mat_ref = mats[j % len(mats)]
+            elif trait_type == 'mat_set':
+                for mat in mats:
+                    item.mat_set.add().mat_ref = mat
+            elif trait_type == 'property':
+                item.behavior_set.add().type = 'behavior'
+
+    menu = scene.hvym_menu_meta_data.add()
+    menu.collection_id = col.hvym_id
+    menu.menu_name = 'Menu'
+    action = scene.hvym_action_meta_data.add()
+    action.trait_type = 'action'
+    action.type = 'action0'
+    action.action_set.add().string = 'Track'
+
+    return bpy.context
+
+
+def benchmarks(bpy, addon, context):
+    """ (name, setup, func, calls) of every benchmark, setup runs
+    before each timed run and func is timed over calls calls.
+    """
+    col = context.collection
+    mats = list(bpy.data.materials)
+    colors = [(i / 1000, 1 - i / 1000, 0.5, 1.0) for i in range(1000)]
+    nft_data = context.scene.hvym_collections_data.nftData
+
+    def no_setup():
+        pass
+
+    def clear_mat_refs():
+        addon.MAT_REF_CACHE.clear()
+
+    def clear_nft_cache():
+        addon.NFT_CACHE.clear()
+        #the contract part comes from the cli, keep it out of the timings
+        addon.NFT_CACHE.scene_parts.discard('contract')
+        nft_data['contract'] = {}
+
+    def dirty_one_item():
+        addon.markItemDirty(col, 0)
+
+    def create_mat_refs():
+        for mat in mats:
+            addon.create_mat_ref(mat)
+
+    def colors_to_hex():
+        for color in colors:
+            addon.color_to_hex(color)
+
+    def set_enums():
+        for i in range(len(ENUM_ITEMS)):
+            addon.setEnum(ENUM_ITEMS, f'ENUM{i}', 'ENUM0')
+
+    return [
+        ('property_group_to_dict', no_setup, lambda: addon.property_group_to_dict(col.hvym_meta_data), 1),
+        ('create_mat_ref', no_setup, create_mat_refs, max(len(mats), 1)),
+        ('create_mat_ref_uncached', clear_mat_refs, create_mat_refs, max(len(mats), 1)),
+        ('color_to_hex', no_setup, colors_to_hex, len(colors)),
+        ('setEnum', no_setup, set_enums, len(ENUM_ITEMS)),
+        ('nft_data_full', clear_nft_cache, lambda: addon.updateNftData(context, col), 1),
+        ('nft_data_one_item', dirty_one_item, lambda: addon.updateNftData(context, col), 1),
+    ]
+
+
+def run_benchmark(setup, func, calls, repeat):
+    setup()
+    func()
+    times = []
+    for i in range(repeat):
+        setup()
+        start = perf_counter()
+        func()
+        times.append((perf_counter() - start) / calls)
+
+    return {
+        'calls': calls,
+        'repeat': repeat,
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.fmean(times),
+    }
+
+
+def compare(results, baseline, threshold):
+    """ Names of the benchmarks that got slower than threshold times
+    their baseline median.
+    """
+    slower = []
+    for name, result in results['benchmarks'].items():
+        old = baseline['benchmarks'].get(name)
+        if old != None and result['median'] > old['median'] * threshold:
+            slower.append((name, old['median'], result['median']))
+
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Headless benchmarks of the serializer and nft data update path.')
+    parser.add_argument('--items', type=int, default=20, help='items of each trait type')
+    parser.add_argument('--mesh-set', type=int, default=8, help='entries in each mesh set')
+    parser.add_argument('--materials', type=int, default=8, help='materials in the scene and in each material set')
+    parser.add_argument('--repeat', type=int, default=20, help='timed runs of each benchmark')
+    parser.add_argument('--only', action='append', default=[], help='run only the named benchmark, can be repeated')
+    parser.add_argument('--output', help='write the results as json to this file')
+    parser.add_argument('--compare', help='results file of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=1.25, help='slowdown ratio reported by --compare')
+    args = parser.parse_args(argv)
+
+    bpy, addon = load_addon()
+    context = build_scene(bpy, args.items, args.mesh_set, args.materials)
+
+    results = {
+        'version': RESULTS_VERSION,
+        'time': time(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': {'items': args.items, 'mesh_set': args.mesh_set, 'materials': args.materials, 'repeat': args.repeat},
+        'benchmarks': {},
+    }
+    for name, setup, func, calls in benchmarks(bpy, addon, context):
+        if len(args.only) > 0 and name not in args.only:
+            continue
+        result = run_benchmark(setup, func, calls, args.repeat)
+        results['benchmarks'][name] = result
+        print(f"{name:28} median {result['median'] * 1e6:10.2f} us   min {result['min'] * 1e6:10.2f} us")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline['params'] != results['params']:
+            print(f"Baseline was taken with {baseline['params']}, timings may not be comparable.")
+        slower = compare(results, baseline, args.threshold)
+        for name, old, new in slower:
+            print(f"{name} is slower: {old * 1e6:.2f} us -> {new * 1e6:.2f} us")
+        if len(slower) > 0:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
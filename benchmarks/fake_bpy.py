@@ -0,0 +1,459 @@
+"""
+Stand-in for the parts of bpy the addon touches at import, register()
+and in its serialize and update path, so those can be timed without
+Blender. install() puts the fake modules in sys.modules, it has to run
+before the addon is imported.
+
+Property groups follow the bpy API closely enough for the serializers:
+annotations become entries of cls.bl_rna.properties, properties set on
+a registered class later are picked up by existing instances, and
+collection properties support add(), remove() and move(). Nothing is
+drawn and operators are never run.
+"""
+import os
+import sys
+import tempfile
+import types
+
+
+class PropertyDeferred:
+    def __init__(self, function, keywords):
+        self.function = function
+        self.keywords = keywords
+
+
+PROPERTY_FUNCTIONS = {
+    'BoolProperty': 'BOOLEAN',
+    'IntProperty': 'INT',
+    'FloatProperty': 'FLOAT',
+    'StringProperty': 'STRING',
+    'EnumProperty': 'ENUM',
+    'PointerProperty': 'POINTER',
+    'CollectionProperty': 'COLLECTION',
+    'FloatVectorProperty': 'FLOAT',
+    'IntVectorProperty': 'INT',
+    'BoolVectorProperty': 'BOOLEAN',
+}
+
+
+def property_function(function):
+    def prop(**keywords):
+        return PropertyDeferred(function, keywords)
+
+    prop.__name__ = function
+    return prop
+
+
+class RNAProperty:
+    def __init__(self, identifier, deferred):
+        keywords = deferred.keywords
+        self.identifier = identifier
+        self.type = PROPERTY_FUNCTIONS[deferred.function]
+        self.is_array = deferred.function.endswith('VectorProperty')
+        self.array_length = keywords.get('size', 3) if self.is_array else 0
+        self.subtype = keywords.get('subtype', 'NONE')
+        self.is_enum_flag = 'ENUM_FLAG' in keywords.get('options', ())
+        self.keywords = keywords
+
+    def default(self):
+        keywords = self.keywords
+        if self.type == 'COLLECTION':
+            return CollectionProperty(keywords['type'])
+        if self.type == 'POINTER':
+            item_type = keywords.get('type')
+            if isinstance(item_type, type) and issubclass(item_type, PropertyGroup):
+                return item_type()
+            return None
+        if self.is_array:
+            return list(keywords.get('default', (0,) * self.array_length))
+        if 'default' in keywords:
+            return keywords['default']
+        if self.type == 'ENUM':
+            items = keywords.get('items')
+            if isinstance(items, (tuple, list)) and len(items) > 0:
+                return items[0][0]
+            return ''
+
+        return {'BOOLEAN': False, 'INT': 0, 'FLOAT': 0.0, 'STRING': ''}.get(self.type)
+
+
+class RNAStruct:
+    def __init__(self, identifier, properties):
+        self.identifier = identifier
+        self.properties = properties
+
+
+class StructMeta(type):
+    """ Collects the property annotations of a class, and of its bases,
+    into cls.bl_rna.
+    """
+
+    def __init__(cls, name, bases, namespace):
+        super().__init__(name, bases, namespace)
+        properties = [RNAProperty('rna_type', PropertyDeferred('PointerProperty', {})),
+                      RNAProperty('name', PropertyDeferred('StringProperty', {'default': ''}))]
+        for base in reversed(cls.__mro__[1:]):
+            for prop in getattr(getattr(base, 'bl_rna', None), 'properties', []):
+                if prop.identifier not in [p.identifier for p in properties]:
+                    properties.append(prop)
+        for key, value in namespace.get('__annotations__', {}).items():
+            if isinstance(value, PropertyDeferred):
+                properties.append(RNAProperty(key, value))
+        cls.bl_rna = RNAStruct(name, properties)
+
+    def __setattr__(cls, key, value):
+        if isinstance(value, PropertyDeferred):
+            cls.bl_rna.properties.append(RNAProperty(key, value))
+            return
+        super().__setattr__(key, value)
+
+    def __delattr__(cls, key):
+        cls.bl_rna.properties = [p for p in cls.bl_rna.properties if p.identifier != key]
+        if key in cls.__dict__:
+            super().__delattr__(key)
+
+
+class bpy_struct(metaclass=StructMeta):
+
+    def __init__(self, **kwargs):
+        for prop in type(self).bl_rna.properties:
+            if prop.identifier != 'rna_type':
+                object.__setattr__(self, prop.identifier, prop.default())
+        for key, value in kwargs.items():
+            object.__setattr__(self, key, value)
+
+    def __getattr__(self, key):
+        #properties registered after the instance was made
+        for prop in type(self).bl_rna.properties:
+            if prop.identifier == key:
+                if key == 'rna_type':
+                    return type(self).bl_rna
+                value = prop.default()
+                object.__setattr__(self, key, value)
+                return value
+
+        raise AttributeError(key)
+
+    def as_pointer(self):
+        return id(self)
+
+    def _idprops(self):
+        if '_idprops_data' not in self.__dict__:
+            object.__setattr__(self, '_idprops_data', {})
+        return self.__dict__['_idprops_data']
+
+    def __setitem__(self, key, value):
+        self._idprops()[key] = value
+
+    def __getitem__(self, key):
+        return self._idprops()[key]
+
+    def __contains__(self, key):
+        return key in self._idprops()
+
+    def __delitem__(self, key):
+        del self._idprops()[key]
+
+    def keys(self):
+        return self._idprops().keys()
+
+    def get(self, key, default=None):
+        return self._idprops().get(key, default)
+
+    def to_dict(self):
+        return dict(self._idprops())
+
+    @property
+    def id_data(self):
+        return self.__dict__.get('_id_data', self)
+
+
+class PropertyGroup(bpy_struct):
+    pass
+
+
+class CollectionProperty(list):
+
+    def __init__(self, item_type=None):
+        super().__init__()
+        self.item_type = item_type
+
+    def add(self):
+        item = self.item_type() if self.item_type != None else PropertyGroup()
+        self.append(item)
+        return item
+
+    def remove(self, index):
+        del self[index]
+
+    def move(self, a, b):
+        self.insert(b, self.pop(a))
+
+    def find(self, name):
+        for i, item in enumerate(self):
+            if item.name == name:
+                return i
+        return -1
+
+    def keys(self):
+        return [item.name for item in self]
+
+
+class IDCollection(CollectionProperty):
+
+    def new(self, name):
+        item = self.item_type(name)
+        self.append(item)
+        return item
+
+    def link(self, item):
+        if item not in self:
+            self.append(item)
+
+    def unlink(self, item):
+        if item in self:
+            list.remove(self, item)
+
+    def remove(self, item):
+        self.unlink(item)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            for item in self:
+                if item.name == key:
+                    return item
+            raise KeyError(key)
+        return list.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        for item in self:
+            if item.name == key:
+                return item
+        return default
+
+
+class ID(bpy_struct):
+
+    def __init__(self, name='', **kwargs):
+        super().__init__(**kwargs)
+        object.__setattr__(self, 'name', name)
+
+
+class NodeSocket:
+
+    def __init__(self, name, default_value):
+        self.name = name
+        self.identifier = name
+        self.default_value = default_value
+        self.is_linked = False
+
+
+class NodeInputs(dict):
+
+    def __iter__(self):
+        return iter(self.values())
+
+
+class Node:
+
+    def __init__(self, node_type, inputs):
+        self.type = node_type
+        self.name = node_type
+        self.bl_idname = 'ShaderNode' + node_type.title().replace('_', '')
+        self.inputs = NodeInputs({key: NodeSocket(key, value) for key, value in inputs.items()})
+
+
+class NodeLink:
+
+    def __init__(self, from_node, from_socket, to_node, to_socket):
+        self.from_node = from_node
+        self.from_socket = from_socket
+        self.to_node = to_node
+        self.to_socket = to_socket
+        if to_socket != None:
+            to_socket.is_linked = True
+
+
+class NodeTree:
+
+    def __init__(self, nodes=(), links=()):
+        self.nodes = list(nodes)
+        self.links = list(links)
+
+    def as_pointer(self):
+        return id(self)
+
+
+class Material(ID):
+
+    def __init__(self, name='', diffuse_color=(0.8, 0.8, 0.8, 1.0), node_tree=None, **kwargs):
+        super().__init__(name, **kwargs)
+        self.diffuse_color = diffuse_color
+        self.node_tree = node_tree if node_tree != None else NodeTree()
+
+
+class Mesh(ID):
+
+    def __init__(self, name='', **kwargs):
+        super().__init__(name, **kwargs)
+        self.materials = CollectionProperty()
+        self.shape_keys = None
+        self.uv_layers = []
+
+
+class Object(ID):
+
+    def __init__(self, name='', data=None, **kwargs):
+        super().__init__(name, **kwargs)
+        self.data = data
+        self.type = 'MESH' if isinstance(data, Mesh) else 'EMPTY'
+        self.animation_data = None
+        self.children = []
+        self.material_slots = []
+        self.matrix_world = [[float(i == j) for j in range(4)] for i in range(4)]
+        self.parent = None
+        self.modifiers = []
+        self.hide_render = False
+        self.hide_select = False
+
+
+class Collection(ID):
+
+    def __init__(self, name='', **kwargs):
+        super().__init__(name, **kwargs)
+        self.objects = IDCollection(Object)
+        self.all_objects = self.objects
+        self.children = IDCollection(Collection)
+
+
+class Scene(ID):
+
+    def __init__(self, name='Scene', **kwargs):
+        super().__init__(name, **kwargs)
+        self.objects = IDCollection(Object)
+        self.collection = Collection('Scene Collection')
+
+
+class Action(ID):
+
+    def __init__(self, name='', **kwargs):
+        super().__init__(name, **kwargs)
+        self.fcurves = []
+
+
+class AppendableMenu:
+
+    @classmethod
+    def append(cls, func):
+        pass
+
+    @classmethod
+    def remove(cls, func):
+        pass
+
+
+class WindowManager:
+
+    def __init__(self):
+        self.windows = []
+
+    def progress_begin(self, low, high):
+        pass
+
+    def progress_update(self, value):
+        pass
+
+    def progress_end(self):
+        pass
+
+
+class Preview:
+    icon_id = 0
+
+
+class PreviewCollection(dict):
+
+    def load(self, name, path, kind):
+        self[name] = Preview()
+        return self[name]
+
+    def close(self):
+        self.clear()
+
+
+class Timers:
+    """ bpy.app.timers, nothing is ever called back.
+    """
+
+    def __init__(self):
+        self.registered = set()
+
+    def register(self, func, first_interval=0, persistent=False):
+        self.registered.add(func)
+
+    def unregister(self, func):
+        self.registered.discard(func)
+
+    def is_registered(self, func):
+        return func in self.registered
+
+
+def persistent(func):
+    return func
+
+
+def module(name, **attrs):
+    mod = types.ModuleType(name)
+    mod.__dict__.update(attrs)
+    sys.modules[name] = mod
+    return mod
+
+
+def install():
+    """ Register the fake bpy, bpy_extras and rna_prop_ui modules, and
+    return bpy.
+    """
+    if 'bpy' in sys.modules:
+        return sys.modules['bpy']
+
+    props = module('bpy.props', **{name: property_function(name) for name in PROPERTY_FUNCTIONS})
+
+    bpy_types = module('bpy.types',
+        bpy_struct=bpy_struct, PropertyGroup=PropertyGroup, ID=ID, Material=Material, Mesh=Mesh,
+        Object=Object, Collection=Collection, Scene=Scene, Action=Action, Node=Node,
+        NodeTree=NodeTree, NodeLink=NodeLink, NodeSocket=NodeSocket, WindowManager=WindowManager)
+    for name in ('Operator', 'Panel', 'UIList', 'Gizmo', 'GizmoGroup', 'Header', 'Menu', 'AddonPreferences',
+                 'UILayout', 'Depsgraph', 'Key', 'ShaderNodeTree', 'Curve', 'MetaBall', 'Armature', 'Camera',
+                 'Light', 'Image'):
+        setattr(bpy_types, name, StructMeta(name, (bpy_struct,), {}))
+    for name in ('PointerProperty', 'BoolProperty', 'StringProperty', 'FloatProperty', 'EnumProperty', 'CollectionProperty'):
+        setattr(bpy_types, name, type(name, (), {}))
+    for name in ('OUTLINER_MT_asset', 'NLA_MT_channel_context_menu', 'UI_MT_button_context_menu', 'STATUSBAR_HT_header'):
+        setattr(bpy_types, name, AppendableMenu)
+
+    handlers = module('bpy.app.handlers', persistent=persistent,
+        load_pre=[], load_post=[], save_pre=[], save_post=[], undo_post=[], redo_post=[], depsgraph_update_post=[])
+    app = module('bpy.app', handlers=handlers, timers=Timers(), binary_path=sys.executable, version=(4, 0, 0), background=True)
+
+    user_dir = os.path.join(tempfile.gettempdir(), 'hvym_bench_user')
+    previews = module('bpy.utils.previews', new=PreviewCollection, remove=lambda collection: collection.close())
+    utils = module('bpy.utils', previews=previews,
+        register_class=lambda cls: None, unregister_class=lambda cls: None,
+        user_resource=lambda resource_type, path='', create=False: os.path.join(user_dir, resource_type.lower(), path))
+
+    bpy_path = module('bpy.path', abspath=lambda path: path,
+        clean_name=lambda name: ''.join(c if c.isalnum() else '_' for c in name))
+
+    data = types.SimpleNamespace(collections=IDCollection(Collection), objects=IDCollection(Object),
+        materials=IDCollection(Material), meshes=IDCollection(Mesh), actions=IDCollection(Action),
+        filepath='', is_dirty=False)
+    context = types.SimpleNamespace(scene=None, collection=None, active_object=None, object=None,
+        view_layer=None, window=None, area=None, window_manager=WindowManager())
+
+    bpy = module('bpy', types=bpy_types, props=props, app=app, utils=utils, path=bpy_path, data=data, context=context)
+
+    io_utils = module('bpy_extras.io_utils', ExportHelper=type('ExportHelper', (), {'filepath': ''}))
+    module('bpy_extras', io_utils=io_utils)
+    module('rna_prop_ui', PropertyPanel=type('PropertyPanel', (), {}))
+
+    return bpy